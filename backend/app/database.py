@@ -1,22 +1,97 @@
-"""SQLAlchemy engine, session, and declarative base."""
+"""SQLAlchemy engines, sessions, and declarative base.
 
-from sqlalchemy import create_engine
+Two engines share the primary database: the sync `engine` (startup,
+background jobs, inference persistence) and `async_engine`, whose
+`get_async_db` sessions the async routers await so a request waiting on the
+database does not hold a threadpool slot.
+
+With `read_database_url` set, `get_read_db` sends read-only routes to a
+replica through `read_engine` while it is reachable and no more than
+`read_max_staleness_s` behind, and to the primary otherwise.
+"""
+
+import asyncio
+import time
+
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.schema import CreateIndex
 
 from app.config import settings
 
+# Sync backend name → async driver used when ASYNC_DATABASE_URL is not set.
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_url(url: str) -> str:
+    """Return url with its driver swapped for the async one (e.g. psycopg2 → asyncpg)."""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _pool_options(url: str) -> dict:
+    """Queue-pool sizing from settings; SQLite keeps SQLAlchemy's default pool."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_s,
+    }
+
+
 engine = create_engine(settings.database_url, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+_async_database_url = settings.async_database_url or async_url(settings.database_url)
+async_engine = create_async_engine(_async_database_url, pool_pre_ping=True, **_pool_options(_async_database_url))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+if settings.read_database_url:
+    _read_database_url = async_url(settings.read_database_url)
+    read_engine = create_async_engine(_read_database_url, pool_pre_ping=True, **_pool_options(_read_database_url))
+    ReadSessionLocal = async_sessionmaker(read_engine, autoflush=False, expire_on_commit=False)
+else:
+    read_engine = None
+    ReadSessionLocal = None
+
+# Seconds a PostgreSQL standby is behind its primary; 0 when fully replayed or not a standby.
+_REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+_PROBE_TIMEOUT_S = 2.0
+
 
 class Base(DeclarativeBase):
     pass
 
 
 def init_db() -> None:
-    """Create all tables."""
-    from app.models import aircraft, component, rul_prediction  # noqa: F401
+    """Create all tables and any indexes missing from existing ones."""
+    from app.models import aircraft, component, rul_prediction, rul_rollup  # noqa: F401
+    from app.services.retention_service import prepare_partitions
+    prepare_partitions()
     Base.metadata.create_all(bind=engine)
+    ensure_indexes()
+
+
+def ensure_indexes() -> None:
+    """Create declared indexes absent from the database.
+
+    `create_all` skips tables that already exist, so indexes added to a model
+    later would otherwise never reach a deployed database.
+    """
+    # IF NOT EXISTS rather than checkfirst: reflection cannot see expression indexes.
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
 
 
 def get_db():
@@ -26,3 +101,117 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Yield an async DB session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+class ReplicaRouter:
+    """Decides per request whether reads may go to the replica.
+
+    Reachability and replay lag are probed at most every `check_interval_s`;
+    between probes the last verdict is reused.
+    """
+
+    def __init__(self, max_staleness_s: float, check_interval_s: float):
+        self.max_staleness_s = max_staleness_s
+        self.check_interval_s = check_interval_s
+        self._lock = asyncio.Lock()
+        self._checked_at: float | None = None
+        self.healthy = False
+        self.lag_s: float | None = None
+        self.last_error: str | None = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.fallbacks = 0
+
+    async def use_replica(self) -> bool:
+        """True when the replica is configured, reachable and fresh enough."""
+        if read_engine is None:
+            return False
+        if self._due():
+            async with self._lock:
+                if self._due():
+                    await self._probe()
+        return self.healthy
+
+    def mark_down(self, error: Exception) -> None:
+        """Bypass the replica until the next probe after it failed a request."""
+        was_healthy = self.healthy
+        self.healthy = False
+        self.last_error = str(error) or type(error).__name__
+        self._checked_at = time.monotonic()
+        if was_healthy:
+            print(f"[db] Read replica bypassed ({self.last_error})")
+
+    def _due(self) -> bool:
+        return self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval_s
+
+    async def _probe(self) -> None:
+        first_probe, was_healthy = self._checked_at is None, self.healthy
+        try:
+            self.lag_s = await asyncio.wait_for(self._replay_lag(), _PROBE_TIMEOUT_S)
+            self.healthy = self.max_staleness_s <= 0 or self.lag_s <= self.max_staleness_s
+            self.last_error = None if self.healthy else f"replica {self.lag_s:.1f}s behind"
+        except Exception as e:
+            self.healthy = False
+            self.last_error = str(e) or type(e).__name__
+        self._checked_at = time.monotonic()
+        if first_probe or was_healthy != self.healthy:
+            state = "in use" if self.healthy else f"bypassed ({self.last_error})"
+            print(f"[db] Read replica {state}")
+
+    async def _replay_lag(self) -> float:
+        async with read_engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                return float(await conn.scalar(_REPLICA_LAG_SQL))
+            await conn.execute(text("SELECT 1"))
+            return 0.0
+
+    def stats(self) -> dict:
+        return {
+            "configured": read_engine is not None,
+            "healthy": self.healthy,
+            "lag_s": self.lag_s,
+            "max_staleness_s": self.max_staleness_s,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "fallbacks": self.fallbacks,
+            "last_error": self.last_error,
+        }
+
+
+replica_router = ReplicaRouter(settings.read_max_staleness_s, settings.read_check_interval_s)
+
+
+async def get_read_db():
+    """Yield an async session for read-only routes: replica when usable, else primary.
+
+    The replica connection is checked out before the route runs, so a replica
+    that went away since the last probe falls back to the primary for this
+    request and is bypassed for the following ones.
+    """
+    if await replica_router.use_replica():
+        db = ReadSessionLocal()
+        try:
+            await asyncio.wait_for(db.connection(), _PROBE_TIMEOUT_S)
+        except Exception as e:
+            await db.close()
+            replica_router.mark_down(e)
+            replica_router.fallbacks += 1
+        else:
+            replica_router.replica_reads += 1
+            async with db:
+                yield db
+            return
+    replica_router.primary_reads += 1
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def replica_stats() -> dict:
+    """Return read-replica health, lag and read routing counts."""
+    return replica_router.stats()
@@ -1,22 +1,58 @@
 """IFRPM FastAPI application."""
 
+import asyncio
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import init_db
-from app.ml.loader import load_models
-from app.routers import aircraft, alerts, fleet, rul, weather
+from app.database import async_engine, init_db, read_engine
+from app.ml.executor import start_executor, stop_executor
+from app.ml.inference import start_batcher, stop_batcher
+from app.ml.loader import load_models, start_watcher, stop_watcher
+from app.routers import aircraft, alerts, diagnostics, fleet, rul, weather
+from app.services import rescoring_service, response_cache, retention_service
+from app.services.prediction_writer import start_writer, stop_writer
+from app.services.stream_service import checkpoint_features, restore_features
+from app.startup import finish, run_phase
+
+
+async def _database_phases() -> None:
+    from app.seed import run as seed
+    await run_phase("init_db", init_db)
+    await run_phase("seed", seed)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    init_db()
-    load_models()
-    from app.seed import run as seed
-    seed()
+    started = time.perf_counter()
+    # Schema + seed and model indexing are independent — run them side by side.
+    await asyncio.gather(
+        _database_phases(),
+        run_phase("load_models", load_models),
+    )
+    await run_phase("start_executor", start_executor)
+    await run_phase("start_batcher", start_batcher)
+    start_writer()
+    restore_features()
+    start_watcher()
+    response_cache.start_listener()
+    rescoring_service.start_scheduler()
+    retention_service.start_scheduler()
+    finish(started)
     yield
+    retention_service.stop_scheduler()
+    rescoring_service.stop_scheduler()
+    response_cache.stop_listener()
+    stop_watcher()
+    stop_batcher()
+    stop_writer()
+    checkpoint_features()
+    stop_executor()
+    await async_engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
 
 
 app = FastAPI(
@@ -38,6 +74,7 @@ app.include_router(aircraft.router, prefix="/api/v1/aircraft", tags=["Aircraft"]
 app.include_router(rul.router,      prefix="/api/v1/rul",      tags=["RUL"])
 app.include_router(alerts.router,   prefix="/api/v1/alerts",   tags=["Alerts"])
 app.include_router(weather.router,  prefix="/api/v1/weather",  tags=["Weather"])
+app.include_router(diagnostics.router, prefix="/api/v1/diagnostics", tags=["Diagnostics"])
 
 
 @app.get("/health", tags=["Meta"])
@@ -0,0 +1,213 @@
+"""Dynamic micro-batching in front of batch inference.
+
+Concurrent single-window callers are queued and drained by one worker thread
+into batches bounded by `max_batch_size` and `max_wait_ms`; each batch runs
+through the ensemble as one stacked call. When the batch function returns a
+Future (process-pool dispatch), up to `max_inflight` batches run at once.
+
+Once `stop` begins, `submit` raises `BatcherStopped`; anything the worker did
+not get to is failed with it rather than left pending.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+_STOP = object()
+
+
+class BatcherStopped(RuntimeError):
+    """Raised for items submitted to, or left queued in, a stopped batcher."""
+
+
+class MicroBatcher:
+    """Gather concurrent requests into micro-batches for a batch function.
+
+    @param batch_fn       - Callable mapping a list of items to a same-length result
+                            list, or to a Future resolving to one.
+    @param max_batch_size - Upper bound on items per batch.
+    @param max_wait_ms    - Longest time the first queued item waits for company.
+    @param max_inflight   - Batches allowed to run concurrently (Future batch_fn only).
+    """
+
+    def __init__(self, batch_fn: Callable[[list], list | Future], max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, max_inflight: int = 1):
+        self._batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000.0
+        self.max_inflight = max(1, max_inflight)
+        self._slots = threading.BoundedSemaphore(self.max_inflight)
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._lock = threading.Lock()
+        self._batch_sizes: dict[int, int] = {}
+        self._wait_ms: dict[float, int] = {}
+        self._batches = 0
+        self._items = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the worker thread; no-op if already running."""
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="ifrpm-microbatch", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Drain queued work, wait for in-flight batches and stop the worker thread.
+
+        Items the worker could not run before `timeout` are failed with BatcherStopped.
+        """
+        if not self.running:
+            return
+        with self._lock:
+            self._stopping = True
+            self._queue.put(_STOP)
+        thread, self._thread = self._thread, None
+        thread.join(timeout)
+        acquired = sum(self._slots.acquire(timeout=timeout) for _ in range(self.max_inflight))
+        for _ in range(acquired):
+            self._slots.release()
+        while True:
+            try:
+                nxt = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if nxt is not _STOP:
+                _fail(nxt[1], BatcherStopped("Micro-batcher stopped before this item ran."))
+        if thread.is_alive():
+            self._queue.put(_STOP)  # let a worker stuck past the timeout exit once it is free
+
+    def submit(self, item: Any) -> Future:
+        """Queue one item and return a Future for its result.
+
+        @raises BatcherStopped when the batcher is not running or is stopping.
+        """
+        fut: Future = Future()
+        with self._lock:
+            # Under the lock, so every accepted item is queued ahead of the stop marker.
+            if self._stopping or not self.running:
+                raise BatcherStopped("Micro-batcher is not running.")
+            self._queue.put((item, fut, time.perf_counter()))
+        return fut
+
+    def __call__(self, item: Any, timeout: float | None = None) -> Any:
+        """Submit one item and block until its batch has run.
+
+        @raises TimeoutError when no result arrives within `timeout` seconds.
+        """
+        return self.submit(item).result(timeout)
+
+    def stats(self) -> dict:
+        """Return queue depth plus batch-size and queue-wait histograms."""
+        with self._lock:
+            return {
+                "running": self.running,
+                "queue_depth": self._queue.qsize(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_s * 1000.0,
+                "max_inflight": self.max_inflight,
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": round(self._items / self._batches, 3) if self._batches else 0.0,
+                "batch_size_histogram": {str(k): v for k, v in sorted(self._batch_sizes.items())},
+                "queue_wait_ms_histogram": {str(k): v for k, v in sorted(self._wait_ms.items())},
+            }
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait_s
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    nxt = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stopping = True
+                    break
+                batch.append(nxt)
+            self._execute(batch)
+
+        # Fail nothing silently: run whatever was queued behind the stop marker.
+        leftover = []
+        while not self._queue.empty():
+            nxt = self._queue.get_nowait()
+            if nxt is not _STOP:
+                leftover.append(nxt)
+        for i in range(0, len(leftover), self.max_batch_size):
+            self._execute(leftover[i:i + self.max_batch_size])
+
+    def _execute(self, batch: list) -> None:
+        # Blocking here while every slot is busy lets the queue build up,
+        # so the next batch is larger rather than adding to a backlog.
+        self._slots.acquire()
+        started = time.perf_counter()
+        self._record(len(batch), [(started - t) * 1000.0 for _, _, t in batch])
+        items = [item for item, _, _ in batch]
+        try:
+            results = self._batch_fn(items)
+        except Exception as exc:
+            self._resolve(batch, None, exc)
+            return
+        if isinstance(results, Future):
+            results.add_done_callback(
+                lambda f: self._resolve(batch, None if f.exception() else f.result(), f.exception())
+            )
+        else:
+            self._resolve(batch, results, None)
+
+    def _resolve(self, batch: list, results: list | None, exc: BaseException | None) -> None:
+        try:
+            if exc is None and (results is None or len(results) < len(batch)):
+                exc = RuntimeError(
+                    f"Batch function returned {0 if results is None else len(results)} results "
+                    f"for {len(batch)} items."
+                )
+            for i, (_, fut, _) in enumerate(batch):
+                if exc is not None:
+                    _fail(fut, exc)
+                elif not fut.done():
+                    fut.set_result(results[i])
+        finally:
+            self._slots.release()
+
+    def _record(self, size: int, waits_ms: list[float]) -> None:
+        bucket = 1
+        while bucket < size:
+            bucket *= 2
+        with self._lock:
+            self._batches += 1
+            self._items += size
+            self._batch_sizes[bucket] = self._batch_sizes.get(bucket, 0) + 1
+            for w in waits_ms:
+                edge = _wait_bucket(w)
+                self._wait_ms[edge] = self._wait_ms.get(edge, 0) + 1
+
+
+def _fail(fut: Future, exc: BaseException) -> None:
+    if not fut.done():
+        fut.set_exception(exc)
+
+
+_WAIT_EDGES_MS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0)
+
+
+def _wait_bucket(wait_ms: float) -> float:
+    """Return the upper edge of the histogram bucket holding wait_ms."""
+    for edge in _WAIT_EDGES_MS:
+        if wait_ms <= edge:
+            return edge
+    return float("inf")
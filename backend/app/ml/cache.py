@@ -0,0 +1,108 @@
+"""Content-addressed cache of ensemble predictions.
+
+Keys are a BLAKE2b digest of a window's column names, shape, dtype and raw
+buffer, so retransmitted or re-requested windows skip the ensemble entirely.
+Entries are evicted least-recently-used beyond `max_entries` and expire after
+`ttl_s`. Each entry belongs to a model registry generation; when the registry
+changes (hot reload, artifact added or removed) the cache empties itself.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.ml.features import RawWindow
+
+
+def window_key(window: RawWindow) -> bytes:
+    """Return a 16-byte digest of the window's layout and numeric contents."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update("\x1f".join(window.columns).encode())
+    h.update(np.asarray(window.values.shape, dtype=np.int64).tobytes())
+    h.update(window.values.dtype.str.encode())
+    h.update(np.ascontiguousarray(window.values))
+    return h.digest()
+
+
+class PredictionCache:
+    """Thread-safe LRU + TTL map from window digest to prediction.
+
+    @param max_entries - Entries kept before least-recently-used eviction (0 disables caching).
+    @param ttl_s       - Seconds an entry stays valid (0 = no expiry).
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_s: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: OrderedDict[bytes, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def sync(self, generation: int) -> None:
+        """Drop every entry if the model registry generation has moved on."""
+        with self._lock:
+            if generation != self._generation:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._generation = generation
+
+    def get(self, key: bytes):
+        """Return the cached prediction for key, or None."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            stored_at, value = item
+            if self.ttl_s > 0 and time.monotonic() - stored_at > self.ttl_s:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, value, generation: int) -> None:
+        """Store value unless it was scored under an older registry generation."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """Return size, limits, and hit / miss / eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "generation": self._generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
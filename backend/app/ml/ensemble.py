@@ -0,0 +1,177 @@
+"""Declarative RUL ensemble: members, weights and per-member deadlines.
+
+The spec comes from `settings.ensemble_spec` (JSON list via the ENSEMBLE_SPEC
+env var), e.g. `[{"name": "ngafid", "weight": 2, "timeout_ms": 50}]`. Members
+run concurrently; a member that misses its deadline or raises is dropped from
+that request's weighted mean. Deadlines count from the start of the whole
+batch, across every column layout in it.
+
+A call that overruns its deadline cannot be interrupted and keeps its pool
+thread. Until it returns, that member is skipped rather than queued behind
+it, and once overdue calls leave too few free threads for a batch the pool
+is replaced, so hung models cannot starve the others.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from app.config import settings
+from app.ml.features import FeaturePipeline
+
+
+@dataclass(frozen=True)
+class EnsembleMember:
+    name: str
+    weight: float = 1.0
+    timeout_ms: float = 250.0
+
+
+@dataclass
+class EnsemblePrediction:
+    rul: float
+    members: list[str] = field(default_factory=list)
+    model_version: str = "stub-v0"
+
+
+DEFAULT_ENSEMBLE = [
+    EnsembleMember("ngafid"),
+    EnsembleMember("battery_xgb_model"),
+]
+
+_pool: ThreadPoolExecutor | None = None
+_pool_size = 0
+_pool_overdue = 0  # threads of _pool held by calls past their deadline
+_overdue_lock = threading.Lock()
+_overdue: dict[str, int] = {}  # member name -> calls still running past their deadline
+
+
+def load_ensemble_spec() -> list[EnsembleMember]:
+    """Return the configured ensemble, or the default two-member ensemble."""
+    if not settings.ensemble_spec:
+        return list(DEFAULT_ENSEMBLE)
+    return [EnsembleMember(**entry) for entry in settings.ensemble_spec]
+
+
+def run_members(
+    members: list[tuple[EnsembleMember, object, str, FeaturePipeline | None]],
+    groups: list[tuple[np.ndarray, tuple[str, ...]]],
+) -> list[list[EnsemblePrediction] | None]:
+    """Score every window group with every resolved member concurrently and blend by weight.
+
+    All calls are submitted up front, so each member's deadline covers the
+    whole batch rather than one group.
+
+    @param members - Resolved (spec, model, version, feature pipeline) tuples;
+                     unavailable models already removed.
+    @param groups  - (stacked (n_windows, n_readings, n_columns) readings, column names) pairs.
+    @returns       - Per group, one prediction per window, or None when no member contributed.
+    """
+    with _overdue_lock:
+        stuck = set(_overdue)
+    for m, *_ in members:
+        if m.name in stuck:
+            print(f"[ml] {m.name} skipped: an earlier call is still running past its deadline.")
+    members = [entry for entry in members if entry[0].name not in stuck]
+    if not members:
+        return [None] * len(groups)
+
+    started = time.perf_counter()
+    pool = _get_pool(len(members) * len(groups))
+    futures = [
+        [(m, v, pool.submit(_score, model, features, windows, columns)) for m, model, v, features in members]
+        for windows, columns in groups
+    ]
+
+    results: list[list[EnsemblePrediction] | None] = []
+    for (windows, _), group in zip(groups, futures):
+        n_rows = windows.shape[0]
+        total = np.zeros(n_rows)
+        weight_sum = 0.0
+        contributed: list[str] = []
+        versions: list[str] = []
+        for member, version, fut in sorted(group, key=lambda mvf: mvf[0].timeout_ms):
+            remaining = member.timeout_ms / 1000.0 - (time.perf_counter() - started)
+            try:
+                pred = _as_column(fut.result(timeout=max(0.0, remaining)), n_rows)
+            except TimeoutError:
+                if not fut.cancel():
+                    _track_overdue(member.name, fut, pool)
+                print(f"[ml] {member.name} missed its {member.timeout_ms:.0f} ms deadline; dropped.")
+                continue
+            except Exception as e:
+                print(f"Error predicting with {member.name}: {e}")
+                continue
+            total += pred * member.weight
+            weight_sum += member.weight
+            contributed.append(member.name)
+            versions.append(f"{member.name}@{version}")
+
+        if weight_sum <= 0:
+            results.append(None)
+            continue
+        model_version = "+".join(versions)
+        results.append([EnsemblePrediction(float(v), list(contributed), model_version) for v in total / weight_sum])
+    return results
+
+
+def _track_overdue(name: str, fut, pool: ThreadPoolExecutor) -> None:
+    """Skip member `name`, and count its thread as taken, until its running overdue call returns."""
+    global _pool_overdue
+    with _overdue_lock:
+        _overdue[name] = _overdue.get(name, 0) + 1
+        if pool is _pool:
+            _pool_overdue += 1
+
+    def _done(_) -> None:
+        global _pool_overdue
+        with _overdue_lock:
+            if pool is _pool:
+                _pool_overdue -= 1
+            _overdue[name] -= 1
+            if _overdue[name] <= 0:
+                del _overdue[name]
+                print(f"[ml] {name} returned after its deadline; back in the ensemble.")
+
+    fut.add_done_callback(_done)
+
+
+def _score(model, features: FeaturePipeline | None, windows: np.ndarray, columns: tuple[str, ...]):
+    """Build a member's input rows and score them.
+
+    Members without a feature pipeline get each window flattened reading by
+    reading, the layout legacy pickled models were trained on.
+    """
+    if features is not None:
+        X = features.transform(windows, columns)
+    else:
+        X = windows.reshape(windows.shape[0], -1)
+    return model.predict(X)
+
+
+def _get_pool(n_calls: int) -> ThreadPoolExecutor:
+    # Sized with headroom for `n_calls` concurrent member calls. A member that
+    # overran its deadline keeps its thread until the model call returns; when
+    # that leaves fewer than `n_calls` free threads, start a fresh pool. The old
+    # one is only dropped, not shut down: batches still using it finish, and its
+    # threads exit once it is garbage-collected and their calls have returned.
+    global _pool, _pool_size, _pool_overdue
+    with _overdue_lock:
+        if _pool is None or _pool_size - _pool_overdue < n_calls:
+            if _pool is not None:
+                print(f"[ml] {_pool_overdue} ensemble threads held by overdue calls; starting a fresh pool.")
+            _pool_size = max(2, n_calls * 2)
+            _pool = ThreadPoolExecutor(max_workers=_pool_size, thread_name_prefix="ifrpm-ensemble")
+            _pool_overdue = 0
+        return _pool
+
+
+def _as_column(raw_pred, n_rows: int) -> np.ndarray:
+    """Coerce a model's raw output to a 1-D float array of length n_rows."""
+    arr = np.asarray(raw_pred, dtype=float).reshape(-1)
+    if arr.shape[0] != n_rows:
+        arr = arr.reshape(n_rows, -1)[:, 0]
+    return arr
@@ -0,0 +1,76 @@
+"""Dedicated process pool for CPU-bound ensemble inference.
+
+Model calls run in worker processes so XGBoost / Keras compute never competes
+for the GIL with request parsing and SQLAlchemy work in the API process.
+Each worker pins its intra-op thread count so N workers use N × threads cores.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from app.config import settings
+
+_THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "TF_NUM_INTRAOP_THREADS",
+)
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _init_worker(intra_op_threads: int) -> None:
+    """Pin native thread pools and load models once per worker process."""
+    for var in _THREAD_ENV_VARS:
+        os.environ[var] = str(intra_op_threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(intra_op_threads)
+    except ImportError:
+        pass
+
+    from app.ml.loader import load_models, start_watcher
+    load_models()
+    start_watcher()
+
+
+def start_executor() -> None:
+    """Spin up the inference worker pool when `inference_workers` > 0."""
+    global _pool
+    if _pool is not None or settings.inference_workers <= 0:
+        return
+    # spawn: workers must not inherit the parent's DB connections or threads.
+    _pool = ProcessPoolExecutor(
+        max_workers=settings.inference_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(settings.inference_intra_op_threads,),
+    )
+
+
+def stop_executor() -> None:
+    """Shut down the worker pool, waiting for in-flight batches."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+
+def worker_count() -> int:
+    """Return the number of inference worker processes (0 = in-process)."""
+    return settings.inference_workers if _pool is not None else 0
+
+
+def submit(fn, *args) -> Future:
+    """Run fn(*args) in the worker pool, or inline when the pool is disabled."""
+    if _pool is not None:
+        return _pool.submit(fn, *args)
+    fut: Future = Future()
+    try:
+        fut.set_result(fn(*args))
+    except Exception as exc:
+        fut.set_exception(exc)
+    return fut
@@ -0,0 +1,160 @@
+"""Serving-side replay of the feature pipeline fitted in phase_1.
+
+A model artifact `<name>.<ext>` may ship a `<name>.features.json` sidecar
+written by phase_1/utils/feature_spec.py. When it does, every window scored
+by that model goes through `FeaturePipeline.transform`, which reproduces
+`lstm_rul.preprocess` with numpy over a whole batch at once:
+
+1. rolling mean / std / min / max per sensor (pandas `min_periods=1` semantics)
+2. nearest-centroid operating regime per reading
+3. per-regime MinMax scaling, then regime one-hot columns
+4. the last `window_size` readings, flattened to one row per window
+
+The sidecar carries a parity fixture from training; a pipeline that does not
+reproduce it is rejected at load time.
+"""
+
+import json
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+PARITY_ATOL = 1e-6
+
+
+@dataclass
+class RawWindow:
+    """One request's sensor readings as a (n_readings, n_columns) float matrix."""
+
+    columns: tuple[str, ...]
+    values: np.ndarray
+
+    @classmethod
+    def from_sensors(cls, sensors: dict[str, list[float]]) -> "RawWindow":
+        """Build from a `SensorWindow.sensors` mapping, keeping its column order."""
+        columns = tuple(sensors)
+        if not columns:
+            return cls(columns, np.empty((0, 0)))
+        values = np.column_stack([np.asarray(sensors[c], dtype=float) for c in columns])
+        return cls(columns, values)
+
+
+class FeaturePipeline:
+    """Vectorized transform from raw sensor windows to a model's input rows."""
+
+    def __init__(self, spec: dict):
+        self.raw_columns: list[str] = spec["raw_columns"]
+        self.window_size = int(spec["window_size"])
+        self.roll_window = int(spec["rolling"]["window"])
+        self.centroids = np.asarray(spec["centroids"], dtype=float)
+        self.regimes = np.asarray(spec["scalers"]["regimes"], dtype=int)
+        self.scale_min = np.asarray(spec["scalers"]["min"], dtype=float)
+        self.scale = np.asarray(spec["scalers"]["scale"], dtype=float)
+        self._check = spec.get("check")
+
+        raw_pos = {c: i for i, c in enumerate(self.raw_columns)}
+        self._regime_idx = np.array([raw_pos[c] for c in spec["regime_columns"]])
+        self._sensor_idx = np.array([raw_pos[s] for s in spec["rolling"]["sensors"]])
+
+        # Candidate columns are [raw..., <stat> per sensor for each stat...];
+        # _feature_idx picks them in training's feature column order.
+        candidates = list(self.raw_columns)
+        for stat in spec["rolling"]["stats"]:
+            candidates += [f"{s}_{stat}" for s in spec["rolling"]["sensors"]]
+        pos = {c: i for i, c in enumerate(candidates)}
+        self._stats = spec["rolling"]["stats"]
+        self._feature_idx = np.array([pos[c] for c in spec["feature_columns"]])
+
+        # KMeans label -> scaler row; one-hot columns follow the same order.
+        self._scaler_row = np.full(len(self.centroids), -1)
+        self._scaler_row[self.regimes] = np.arange(len(self.regimes))
+
+        self.n_features = len(self._feature_idx) + len(self.regimes)
+        self.n_features_in_ = self.window_size * self.n_features
+
+    @property
+    def history(self) -> int:
+        """Readings needed for the first scored row to see a full rolling window."""
+        return self.window_size + self.roll_window - 1
+
+    def transform(self, windows: np.ndarray, columns: tuple[str, ...]) -> np.ndarray:
+        """Map stacked raw windows to flattened model input rows.
+
+        @param windows - (n_windows, n_readings, n_columns) raw readings; n_readings >= window_size.
+        @param columns - Column names for the last axis; must cover `raw_columns`.
+        @returns       - (n_windows, window_size × n_features) float64 matrix.
+        """
+        if windows.shape[1] < self.window_size:
+            raise ValueError(f"Window has {windows.shape[1]} readings, model needs {self.window_size}.")
+        missing = [c for c in self.raw_columns if c not in columns]
+        if missing:
+            raise ValueError(f"Window is missing sensor columns {missing}.")
+
+        order = [columns.index(c) for c in self.raw_columns]
+        raw = windows[:, -self.history:, order]                      # (n, T, R)
+        stats = _rolling_stats(raw[..., self._sensor_idx], self.roll_window, self._stats)
+        feats = np.concatenate([raw, *stats], axis=-1)[..., self._feature_idx]
+
+        ops = raw[..., self._regime_idx]
+        dist = ((ops[..., None, :] - self.centroids) ** 2).sum(axis=-1)
+        rows = self._scaler_row[dist.argmin(axis=-1)]                # (n, T)
+        if (rows < 0).any():
+            raise ValueError("Reading falls in a regime with no fitted scaler.")
+
+        scaled = feats * self.scale[rows] + self.scale_min[rows]
+        onehot = np.eye(len(self.regimes))[rows]
+        out = np.concatenate([scaled, onehot], axis=-1)[:, -self.window_size:]
+        return out.reshape(out.shape[0], -1)
+
+    def verify(self) -> None:
+        """Raise ValueError unless transform reproduces the training parity fixture."""
+        if self._check is None:
+            return
+        raw = np.asarray(self._check["raw"], dtype=float)[None]
+        expected = np.asarray(self._check["expected"], dtype=float).reshape(1, -1)
+        got = self.transform(raw, tuple(self.raw_columns))
+        diff = float(np.abs(got - expected).max())
+        if diff > PARITY_ATOL:
+            raise ValueError(f"Feature pipeline diverges from training: max |diff| = {diff:.2e}")
+
+
+def _rolling_stats(x: np.ndarray, window: int, stats: list[str]) -> list[np.ndarray]:
+    """Trailing rolling stats along axis 1 with pandas min_periods=1 semantics.
+
+    std is the sample std (ddof=1), 0 where only one reading is in the window.
+    """
+    n, t, s = x.shape
+    padded = np.concatenate([np.full((n, window - 1, s), np.nan), x], axis=1)
+    view = np.lib.stride_tricks.sliding_window_view(padded, window, axis=1)  # (n, T, S, w)
+    out = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for stat in stats:
+            if stat == "mean":
+                out.append(np.nanmean(view, axis=-1))
+            elif stat == "std":
+                out.append(np.nan_to_num(np.nanstd(view, axis=-1, ddof=1)))
+            elif stat == "min":
+                out.append(np.nanmin(view, axis=-1))
+            elif stat == "max":
+                out.append(np.nanmax(view, axis=-1))
+            else:
+                raise ValueError(f"Unknown rolling stat '{stat}'.")
+    return out
+
+
+def sidecar_path(artifact: Path) -> Path:
+    """Return where an artifact's feature spec lives (`<stem>.features.json`)."""
+    return artifact.with_name(f"{artifact.stem}.features.json")
+
+
+def load_pipeline(artifact: Path) -> FeaturePipeline | None:
+    """Load and verify the artifact's feature pipeline; None when it has no sidecar."""
+    path = sidecar_path(artifact)
+    if not path.exists():
+        return None
+    pipeline = FeaturePipeline(json.loads(path.read_text()))
+    pipeline.verify()
+    return pipeline
@@ -1,48 +1,199 @@
 """Model inference entry point."""
 
-import pandas as pd
+from concurrent.futures import Future
 
-from app.ml.loader import get_model, models_loaded
+import numpy as np
 
+from app.config import settings
+from app.ml import executor
+from app.ml.batcher import BatcherStopped, MicroBatcher
+from app.ml.cache import PredictionCache, window_key
+from app.ml.ensemble import EnsemblePrediction, load_ensemble_spec, run_members
+from app.ml.features import RawWindow
+from app.ml.loader import (
+    get_model, get_model_versioned, model_versions, models_loaded, registry_generation,
+)
 
-def predict_rul(sensor_df: pd.DataFrame) -> float:
-    """Return estimated RUL in engine cycles for the given sensor window."""
+_batcher: MicroBatcher | None = None
+_cache = PredictionCache(settings.prediction_cache_size, settings.prediction_cache_ttl_s)
+
+
+def predict_rul(window: RawWindow) -> EnsemblePrediction:
+    """Return estimated RUL in engine cycles and contributing members for one window.
+
+    Served from the prediction cache when this exact window was scored under
+    the current models. Otherwise routed through the micro-batcher when it is
+    running, so concurrent callers share one stacked ensemble call.
+    """
+    if not _cache.enabled:
+        return _score_one(window)
+    generation = registry_generation()
+    _cache.sync(generation)
+    key = window_key(window)
+    pred = _cache.get(key)
+    if pred is None:
+        pred = _score_one(window)
+        if _cacheable(pred):
+            _cache.put(key, pred, generation)
+    return pred
+
+
+def predict_rul_batch(windows: list[RawWindow]) -> list[EnsemblePrediction]:
+    """Return estimated RUL for each sensor window, scored on the inference executor.
+
+    Cached windows are answered directly; repeated windows within the batch
+    are scored once.
+
+    @raises TimeoutError when scoring takes longer than `inference_timeout_s`, as in `predict_rul`.
+    """
+    if not _cache.enabled:
+        return _await_batch(windows)
+    generation = registry_generation()
+    _cache.sync(generation)
+    keys = [window_key(w) for w in windows]
+    results = [_cache.get(k) for k in keys]
+
+    pending: dict[bytes, int] = {}
+    for i, (key, pred) in enumerate(zip(keys, results)):
+        if pred is None:
+            pending.setdefault(key, i)
+    if pending:
+        scored = dict(zip(pending, _await_batch([windows[i] for i in pending.values()])))
+        for key, pred in scored.items():
+            if _cacheable(pred):
+                _cache.put(key, pred, generation)
+        results = [pred if pred is not None else scored[k] for k, pred in zip(keys, results)]
+    return results
+
+
+def _score_one(window: RawWindow) -> EnsemblePrediction:
+    if _batcher is not None and _batcher.running:
+        try:
+            return _batcher(window, timeout=settings.inference_timeout_s)
+        except BatcherStopped:
+            pass  # shutting down: score directly below
+    return _await_batch([window])[0]
+
+
+def _await_batch(windows: list[RawWindow]) -> list[EnsemblePrediction]:
+    """Score windows on the executor, waiting at most `inference_timeout_s`."""
+    return submit_batch(windows).result(settings.inference_timeout_s)
+
+
+def _cacheable(pred: EnsemblePrediction) -> bool:
+    """Only cache full-strength results from the models this process has indexed.
+
+    Never one degraded by a dropped member, nor one whose member versions
+    differ from the current index: with INFERENCE_WORKERS > 0 a worker may
+    still be serving the previous artifact after this process picked up the
+    new one.
+    """
     if not models_loaded():
-        from app.ml.stub import predict_rul as _stub
-        return _stub(sensor_df)
+        return True
+    versions = model_versions()
+    if not set(pred.members) >= {m.name for m in load_ensemble_spec() if m.name in versions}:
+        return False
+    for tag in pred.model_version.split("+"):
+        name, _, version = tag.partition("@")
+        if versions.get(name) != version:
+            return False
+    return True
+
+
+def submit_batch(windows: list[RawWindow]) -> Future:
+    """Dispatch a batch to the inference worker pool and return its Future."""
+    return executor.submit(score_batch, windows)
+
 
-    ensemble_targets = ["ngafid", "battery_xgb_model"]
-    preds = []
+def score_batch(windows: list[RawWindow]) -> list[EnsemblePrediction]:
+    """Return estimated RUL for each sensor window, one model call per member.
 
-    for name in ensemble_targets:
+    Windows with the same columns and reading count are stacked into one
+    (n_windows, n_readings, n_columns) array, so every ensemble member builds
+    its features and scores the whole group in one `predict`.
+
+    @param windows - Sensor windows in request order.
+    @returns       - RUL estimates in the same order.
+    """
+    if not windows:
+        return []
+    if not models_loaded():
+        return [_stub_prediction(w) for w in windows]
+
+    members = []
+    for member in load_ensemble_spec():
         try:
-            model = get_model(name)
+            members.append((member, *get_model_versioned(member.name)))
         except KeyError:
             continue
-
-        try:
-            raw_pred = model.predict(sensor_df.values.reshape(1, -1))
-            if hasattr(raw_pred, "flatten"):
-                val = float(raw_pred.flatten()[0])
-            elif hasattr(raw_pred, "__len__") and len(raw_pred) > 0:
-                val = float(raw_pred[0])
-            else:
-                val = float(raw_pred)
-            preds.append(val)
         except Exception as e:
-            print(f"Error predicting with {name}: {e}")
+            print(f"[ml] {member.name} unavailable: {e}")
 
-    if preds:
-        return sum(preds) / len(preds)
+    results: list[EnsemblePrediction | None] = [None] * len(windows)
+    groups = list(_stack_windows(windows))
+    scored = run_members(members, [(stacked, columns) for _, columns, stacked in groups])
+    for (idx, _, _), preds in zip(groups, scored):
+        if preds is None:
+            continue
+        for i, pred in zip(idx, preds):
+            results[i] = pred
+
+    return [
+        pred if pred is not None else _stub_prediction(windows[i])
+        for i, pred in enumerate(results)
+    ]
 
+
+def _stub_prediction(window: RawWindow) -> EnsemblePrediction:
     from app.ml.stub import predict_rul as _stub
-    return _stub(sensor_df)
+    return EnsemblePrediction(_stub(window.values), ["stub"])
+
+
+def start_batcher() -> None:
+    """Start the micro-batching scheduler if enabled in settings."""
+    global _batcher
+    if not settings.inference_microbatch_enabled or (_batcher is not None and _batcher.running):
+        return
+    _batcher = MicroBatcher(
+        submit_batch,
+        max_batch_size=settings.inference_max_batch_size,
+        max_wait_ms=settings.inference_max_wait_ms,
+        max_inflight=max(1, executor.worker_count()),
+    )
+    _batcher.start()
+
+
+def stop_batcher() -> None:
+    """Flush pending requests and stop the micro-batching scheduler."""
+    if _batcher is not None:
+        _batcher.stop()
+
+
+def cache_stats() -> dict:
+    """Return prediction cache size and hit / miss / eviction counters."""
+    return _cache.stats()
+
+
+def batcher_stats() -> dict:
+    """Return micro-batcher queue depth and histograms (empty when disabled)."""
+    if _batcher is None:
+        return {"running": False}
+    return _batcher.stats()
+
+
+def _stack_windows(windows: list[RawWindow]):
+    """Yield (indices, columns, stacked readings), one per distinct column layout and shape."""
+    groups: dict[tuple, list[int]] = {}
+    for i, w in enumerate(windows):
+        groups.setdefault((w.columns, w.values.shape), []).append(i)
+    for (columns, _), idx in groups.items():
+        yield idx, columns, np.stack([windows[i].values for i in idx])
 
 
-def detect_anomaly(sensor_df: pd.DataFrame) -> bool:
+def detect_anomaly(window: RawWindow) -> bool:
     """Return True if the sensor window is anomalous."""
     if models_loaded():
         model = get_model("anomaly_model")
-        return bool(model.predict(sensor_df.values.reshape(1, -1))[0] == -1)
+        return bool(model.predict(window.values.reshape(1, -1))[0] == -1)
     from app.ml.stub import detect_anomaly as _stub
-    return _stub(sensor_df)
+    return _stub(window.values)
@@ -1,45 +1,416 @@
-"""Load .pkl model artifacts at startup."""
+"""Model registry — index artifacts at startup, load each on first use.
 
+Resident models are kept in LRU order and evicted once their combined
+resident size exceeds `settings.model_memory_budget_mb` (0 = unlimited).
+`.joblib` artifacts can be memory-mapped so their arrays page in on demand.
+Framework imports (TensorFlow, PyTorch, joblib) happen inside the loader that needs
+them, so startup never pays for a framework no indexed model uses.
+
+A watcher thread re-scans the directory every `model_reload_interval_s`;
+changed artifacts are loaded and warmed up in the background, then swapped in.
+Each artifact's version is a short digest of its size and mtime (and those of
+its `.features.json` sidecar, see `app.ml.features`).
+With `settings.model_variant` = "int8", `<name>_int8.*` is served as `<name>`.
+"""
+
+import hashlib
+import importlib.util
+import os
 import pickle
-import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
 
-try:
-    import tensorflow as tf
-except ImportError:
-    tf = None
+import numpy as np
 
 from app.config import settings
+from app.ml.features import FeaturePipeline, load_pipeline, sidecar_path
 
-_models: dict = {}
 
+@dataclass
+class ModelEntry:
+    name: str
+    path: Path
+    size_on_disk: int
+    version: str
+    model: object = None
+    features: FeaturePipeline | None = None
+    load_ms: float | None = None
+    resident_bytes: int | None = None
+    loads: int = 0
+    hits: int = 0
+    last_used: float | None = None
+    load_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
 
-def load_models() -> None:
-    """Deserialize all .pkl files from the models directory."""
-    model_dir = Path(settings.model_dir)
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
+
+
+def _load_pickle(path: Path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _load_joblib(path: Path):
+    import joblib
+    return joblib.load(path, mmap_mode="r" if settings.model_mmap else None)
+
+
+def _load_keras(path: Path):
+    import tensorflow as tf
+    return tf.keras.models.load_model(str(path))
+
+
+def _load_torchscript(path: Path):
+    from app.ml.torch_runtime import load_torchscript
+    return load_torchscript(path)
+
+
+_LOADERS = {
+    ".pkl": _load_pickle,
+    ".joblib": _load_joblib,
+    ".h5": _load_keras,
+    ".ts": _load_torchscript,
+}
+
+# Artifacts whose framework is optional; skipped at index time when it is missing.
+_FRAMEWORKS = {".h5": "tensorflow", ".ts": "torch"}
+
+
+def _has_framework(suffix: str) -> bool:
+    """Return True if the framework an artifact needs is installed, without importing it."""
+    module = _FRAMEWORKS.get(suffix)
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+def _rss_bytes() -> int | None:
+    """Return current resident set size, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class ModelRegistry:
+    """Lazy, LRU-evicting store of model artifacts keyed by file stem."""
+
+    def __init__(self):
+        self._entries: dict[str, ModelEntry] = {}
+        self._resident: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.RLock()
+        # name -> artifact version whose background reload failed.
+        self._failed: dict[str, str] = {}
+        self.generation = 0
+
+    def index(self, model_dir: Path) -> None:
+        """Record every loadable artifact in model_dir without deserializing it."""
+        entries = {name: ModelEntry(name, path, size, version)
+                   for name, (path, size, version) in _scan(model_dir).items()}
+        with self._lock:
+            self._entries = entries
+            self._resident.clear()
+            self._failed.clear()
+            self.generation += 1
+
+    def refresh(self, model_dir: Path) -> list[str]:
+        """Pick up new, changed and removed artifacts; return the names that changed.
+
+        A changed model that is currently resident is loaded and warmed up off
+        the request path, then swapped in atomically — callers keep getting
+        the old version until the swap. Non-resident entries are re-indexed
+        and load lazily as before.
+        """
+        found = _scan(model_dir, settle_s=_SETTLE_S)
+        changed = []
+        for name, (path, size, version) in found.items():
+            current = self._entries.get(name)
+            if current is not None and current.version == version:
+                continue
+            if self._failed.get(name) == version:
+                continue
+            fresh = ModelEntry(name, path, size, version)
+            if current is not None and current.loaded:
+                try:
+                    _materialize(fresh)
+                    warm_up(fresh.model)
+                except Exception as e:
+                    # Not retried until the artifact changes on disk again.
+                    self._failed[name] = version
+                    print(f"[ml] Reload of {name}@{version} failed, keeping {current.version}: {e}")
+                    continue
+            self._failed.pop(name, None)
+            with self._lock:
+                self._entries[name] = fresh
+                self._resident.pop(name, None)
+                if fresh.loaded:
+                    self._resident[name] = None
+                    self._evict(keep=name)
+            changed.append(name)
+            print(f"[ml] {name} -> {version}" + (" (warmed, swapped)" if fresh.loaded else ""))
+
+        removed = [n for n in self._entries if n not in found and not _settling(self._entries[n].path)]
+        with self._lock:
+            for name in removed:
+                self._entries.pop(name, None)
+                self._resident.pop(name, None)
+                self._failed.pop(name, None)
+            if changed or removed:
+                self.generation += 1
+        return changed + removed
+
+    def names(self) -> list[str]:
+        return list(self._entries)
+
+    def versions(self) -> dict[str, str]:
+        with self._lock:
+            return {name: e.version for name, e in self._entries.items()}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, name: str):
+        """Return the named model, loading it on first use."""
+        return self.get_versioned(name)[0]
+
+    def get_versioned(self, name: str) -> tuple[object, str, FeaturePipeline | None]:
+        """Return (model, version, feature pipeline) from the same entry, loading on first use.
+
+        A cold load runs outside the registry lock, under the entry's own
+        lock: lookups of other models proceed meanwhile, and concurrent
+        callers of the same model wait for the one load.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is None:
+                    raise KeyError(f"Model '{name}' not loaded.")
+                if entry.loaded:
+                    return self._touch(entry)
+
+            with entry.load_lock:
+                if not entry.loaded:
+                    _materialize(entry)
+
+            with self._lock:
+                if self._entries.get(name) is not entry:
+                    # Replaced by a reload or re-index meanwhile; serve what was asked for.
+                    return self._touch(entry)
+                if entry.loaded:
+                    if name not in self._resident:
+                        self._resident[name] = None
+                        self._evict(keep=name)
+                    return self._touch(entry)
+            # Evicted again before this caller got it; load once more.
+
+    def _touch(self, entry: ModelEntry) -> tuple[object, str, FeaturePipeline | None]:
+        """Count a hit and return the entry's (model, version, features); call under the lock."""
+        entry.hits += 1
+        entry.last_used = time.time()
+        if entry.name in self._resident:
+            self._resident.move_to_end(entry.name)
+        return entry.model, entry.version, entry.features
+
+    def stats(self) -> dict:
+        """Return per-model version, load time, resident size and residency."""
+        with self._lock:
+            return {
+                "memory_budget_mb": settings.model_memory_budget_mb,
+                "resident_mb": round(self._resident_total() / 2**20, 2),
+                "generation": self.generation,
+                "models": [
+                    {
+                        "name": e.name,
+                        "version": e.version,
+                        "path": str(e.path),
+                        "size_on_disk": e.size_on_disk,
+                        "loaded": e.loaded,
+                        "failed_version": self._failed.get(e.name),
+                        "features": sidecar_path(e.path).exists(),
+                        "load_ms": e.load_ms,
+                        "resident_bytes": e.resident_bytes,
+                        "loads": e.loads,
+                        "hits": e.hits,
+                    }
+                    for e in self._entries.values()
+                ],
+            }
+
+    def _evict(self, keep: str) -> None:
+        budget = settings.model_memory_budget_mb * 2**20
+        if budget <= 0:
+            return
+        while self._resident_total() > budget and len(self._resident) > 1:
+            name = next(n for n in self._resident if n != keep)
+            del self._resident[name]
+            self._entries[name].model = None
+            self._entries[name].features = None
+            print(f"[ml] Evicted {name} (memory budget {settings.model_memory_budget_mb} MB)")
+
+    def _resident_total(self) -> int:
+        return sum(self._entries[n].resident_bytes or 0 for n in self._resident)
+
+
+# Artifacts modified more recently than this are assumed to still be copying.
+_SETTLE_S = 2.0
+
+
+def _settling(path: Path) -> bool:
+    try:
+        return time.time() - path.stat().st_mtime < _SETTLE_S
+    except OSError:
+        return False
+
+
+def _scan(model_dir: Path, settle_s: float = 0.0) -> dict[str, tuple[Path, int, str]]:
+    """Return {stem: (path, size, version)} for loadable artifacts in model_dir."""
+    found = {}
     if not model_dir.exists():
+        return found
+    now = time.time()
+    for path in sorted(model_dir.iterdir()):
+        if path.suffix not in _LOADERS:
+            continue
+        if not _has_framework(path.suffix):
+            continue
+        st = path.stat()
+        if settle_s and now - st.st_mtime < settle_s:
+            continue
+        stamp = f"{st.st_size}:{st.st_mtime_ns}"
+        sidecar = sidecar_path(path)
+        if sidecar.exists():
+            sc = sidecar.stat()
+            stamp += f":{sc.st_size}:{sc.st_mtime_ns}"
+        digest = hashlib.sha1(stamp.encode()).hexdigest()[:10]
+        found[path.stem] = (path, st.st_size, digest)
+
+    # MODEL_VARIANT=int8 serves <name>_int8.* under <name> wherever one exists.
+    suffix = f"_{settings.model_variant}"
+    if settings.model_variant != "fp32":
+        for stem, (path, size, digest) in list(found.items()):
+            if stem.endswith(suffix):
+                found[stem[: -len(suffix)]] = (path, size, f"{settings.model_variant}-{digest}")
+    return found
+
+
+def _materialize(entry: ModelEntry) -> None:
+    """Deserialize entry.path into entry.model and record load time and size."""
+    rss_before = _rss_bytes()
+    started = time.perf_counter()
+    model = _LOADERS[entry.path.suffix](entry.path)
+    # Features first: `entry.loaded` (model set) is checked without the entry's load lock.
+    entry.features = load_pipeline(entry.path)
+    entry.model = model
+    entry.load_ms = round((time.perf_counter() - started) * 1000.0, 2)
+    rss_after = _rss_bytes()
+    # RSS delta undercounts memory-mapped pages; fall back to file size.
+    delta = rss_after - rss_before if rss_before is not None and rss_after is not None else 0
+    entry.resident_bytes = max(delta, 0) or entry.size_on_disk
+    entry.loads += 1
+    print(f"[ml] Loaded {entry.name}@{entry.version} in {entry.load_ms:.0f} ms "
+          f"({entry.resident_bytes / 2**20:.1f} MB)")
+
+
+def warm_up(model) -> None:
+    """Score synthetic sensor windows so allocation and JIT costs are paid up front.
+
+    The batch has the model's own input shape — the flattened row width a
+    feature pipeline or raw flattening produces, or a Keras model's full
+    (window, features) shape — at batch size 1 and at the micro-batcher's
+    maximum batch size. Models whose input shape is unknown are not warmed.
+    """
+    shape = _input_shape(model)
+    if shape is None:
         return
-    for path in model_dir.glob("*.pkl"):
-        with open(path, "rb") as f:
-            _models[path.stem] = pickle.load(f)
-            
-    if tf is not None:
-        for path in model_dir.glob("*.h5"):
-            _models[path.stem] = tf.keras.models.load_model(str(path))
-            
-    if _models:
-        print(f"[ml] Loaded: {list(_models.keys())}")
+    rng = np.random.default_rng(0)
+    for batch in {1, max(1, settings.inference_max_batch_size)}:
+        model.predict(rng.standard_normal((batch, *shape)))
+
+
+def _input_shape(model) -> tuple[int, ...] | None:
+    """Return the per-sample input shape a model expects, if it advertises a fully known one."""
+    width = getattr(model, "n_features_in_", None)
+    if width:
+        return (int(width),)
+    shape = getattr(model, "input_shape", None)
+    # Multi-input models report a list of shapes; variable dims are None.
+    if not isinstance(shape, tuple) or len(shape) < 2 or not all(shape[1:]):
+        return None
+    return tuple(int(d) for d in shape[1:])
+
+
+_registry = ModelRegistry()
+
+
+_watcher: threading.Thread | None = None
+_watcher_stop = threading.Event()
+
+
+def load_models() -> None:
+    """Index model artifacts in the models directory; loading is deferred to first use."""
+    _registry.index(Path(settings.model_dir))
+    if len(_registry):
+        print(f"[ml] Indexed: {_registry.names()}")
     else:
         print("[ml] No models found — stub inference active.")
 
 
 def models_loaded() -> bool:
-    """Return True when at least one model artifact is loaded."""
-    return len(_models) > 0
+    """Return True when at least one model artifact is available."""
+    return len(_registry) > 0
+
+
+def model_names() -> list[str]:
+    """Return the names of all indexed model artifacts."""
+    return _registry.names()
+
+
+def model_versions() -> dict[str, str]:
+    """Return name -> version of every indexed artifact, without loading any."""
+    return _registry.versions()
 
 
 def get_model(name: str):
-    """Return a model by name; raises KeyError if not loaded."""
-    if name not in _models:
-        raise KeyError(f"Model '{name}' not loaded.")
-    return _models[name]
+    """Return a model by name, loading it on first use; raises KeyError if unknown."""
+    return _registry.get(name)
+
+
+def get_model_versioned(name: str) -> tuple[object, str, FeaturePipeline | None]:
+    """Return (model, version, feature pipeline) for a name, all from one artifact."""
+    return _registry.get_versioned(name)
+
+
+def registry_generation() -> int:
+    """Return a counter bumped on every index change (reload, add, remove)."""
+    return _registry.generation
+
+
+def start_watcher() -> None:
+    """Poll model_dir for new or changed artifacts every `model_reload_interval_s`."""
+    global _watcher
+    if settings.model_reload_interval_s <= 0 or (_watcher is not None and _watcher.is_alive()):
+        return
+    _watcher_stop.clear()
+
+    def _poll() -> None:
+        while not _watcher_stop.wait(settings.model_reload_interval_s):
+            try:
+                _registry.refresh(Path(settings.model_dir))
+            except Exception as e:
+                print(f"[ml] Model refresh failed: {e}")
+
+    _watcher = threading.Thread(target=_poll, name="ifrpm-model-watcher", daemon=True)
+    _watcher.start()
+
+
+def stop_watcher() -> None:
+    """Stop the model directory watcher."""
+    _watcher_stop.set()
+
+
+def model_stats() -> dict:
+    """Return registry residency, load time and resident size per model."""
+    return _registry.stats()
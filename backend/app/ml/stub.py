@@ -3,22 +3,22 @@
 import hashlib
 import math
 
-import pandas as pd
+import numpy as np
 
 
-def predict_rul(sensor_df: pd.DataFrame) -> float:
+def predict_rul(values: np.ndarray) -> float:
     """Return a deterministic RUL estimate (5–120 cycles) derived from sensor mean.
 
-    @param sensor_df - Sensor readings DataFrame.
+    @param values - (n_readings, n_sensors) sensor readings.
     """
-    mean_val = float(sensor_df.mean().mean()) if not sensor_df.empty else 50.0
+    mean_val = float(values.mean()) if values.size else 50.0
     return round(5.0 + abs(math.sin(mean_val)) * 115.0, 2)
 
 
-def detect_anomaly(sensor_df: pd.DataFrame) -> bool:
+def detect_anomaly(values: np.ndarray) -> bool:
     """Return a hash-based anomaly flag (~12.5% positive rate).
 
-    @param sensor_df - Sensor readings DataFrame.
+    @param values - (n_readings, n_sensors) sensor readings.
     """
-    digest = hashlib.md5(sensor_df.to_string().encode()).hexdigest()
+    digest = hashlib.blake2b(np.ascontiguousarray(values, dtype=np.float64), digest_size=8).hexdigest()
     return int(digest[0], 16) < 2
@@ -0,0 +1,68 @@
+"""TorchScript runtime for models exported by phase_1/tasks/export.py.
+
+Each `.ts` artifact has a `.json` sidecar giving its window size, feature
+count and output kind. The wrapper exposes the same `predict(X)` interface as
+the sklearn / Keras models, where X is the stacked (n_windows, window × features)
+matrix built by `app.ml.inference`.
+"""
+
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from app.config import settings
+
+_threads_lock = threading.Lock()
+_threads_set = False
+
+
+def _pin_threads(torch) -> None:
+    """Fix torch's intra/inter-op pools once per process (inter-op can only be set once)."""
+    global _threads_set
+    with _threads_lock:
+        if _threads_set:
+            return
+        torch.set_num_threads(settings.inference_intra_op_threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # already fixed by an earlier parallel op
+        _threads_set = True
+
+
+class TorchScriptModel:
+    """sklearn-style wrapper around a frozen TorchScript module."""
+
+    def __init__(self, path: Path):
+        import torch
+
+        _pin_threads(torch)
+        self._torch = torch
+        self.module = torch.jit.load(str(path), map_location="cpu").eval()
+
+        meta = json.loads(path.with_suffix(".json").read_text())
+        self.window_size = int(meta["window_size"])
+        self.num_features = int(meta["num_features"])
+        self.output = meta.get("output", "rul")
+        self.n_features_in_ = self.window_size * self.num_features
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Score a stacked batch of flattened windows; returns one value per row."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but this model expects "
+                f"{self.window_size} x {self.num_features} = {self.n_features_in_}."
+            )
+        batch = self._torch.from_numpy(X).view(-1, self.window_size, self.num_features)
+        with self._torch.inference_mode():
+            out = self.module(batch)
+        if self.output == "risk_logit":
+            out = self._torch.sigmoid(out)
+        return out.reshape(-1).numpy()
+
+
+def load_torchscript(path: Path) -> TorchScriptModel:
+    return TorchScriptModel(path)
@@ -0,0 +1,143 @@
+"""Decoding of /rul/predict request bodies into RawWindow arrays.
+
+Three content types are accepted:
+
+- `application/json` — `SensorWindow` (or a list of them for /predict/batch)
+- `application/x-ifrpm-window` — one or more raw frames, back to back:
+
+      uint32 LE header length | UTF-8 JSON header | row-major readings
+
+  with header `{"unit_id": "1", "cycle": 5, "columns": ["s1", ...],
+  "rows": 512, "dtype": "<f4"}` (`<f4` float32 or `<f8` float64).
+  The readings become a read-only view of the request body; nothing is copied.
+- `application/vnd.apache.arrow.stream` — an Arrow IPC stream with one record
+  batch per window and one float column per sensor. `unit_id` and `cycle`
+  come from the batch's custom metadata, or the schema metadata for a
+  single window. Requires the optional `pyarrow` package.
+"""
+
+import json
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+from pydantic import TypeAdapter
+
+from app.ml.features import RawWindow
+from app.schemas.rul import SensorWindow
+
+JSON = "application/json"
+RAW_FRAME = "application/x-ifrpm-window"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+CONTENT_TYPES = (JSON, RAW_FRAME, ARROW_STREAM)
+
+_DTYPES = {"<f4": np.dtype("<f4"), "<f8": np.dtype("<f8")}
+_HEADER_LEN = struct.Struct("<I")
+_json_batch = TypeAdapter(list[SensorWindow])
+
+
+class PayloadError(ValueError):
+    """Raised when a binary body is malformed."""
+
+
+class UnsupportedMediaType(ValueError):
+    """Raised for a Content-Type this module cannot decode."""
+
+
+@dataclass
+class WindowPayload:
+    """A decoded request: which unit and cycle the readings belong to."""
+
+    unit_id: str
+    cycle: int
+    window: RawWindow
+
+
+def media_type(content_type: str | None) -> str:
+    """Return the bare media type from a Content-Type header (JSON when absent)."""
+    if not content_type:
+        return JSON
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def decode(body: bytes, content_type: str | None, many: bool) -> list[WindowPayload]:
+    """Decode a request body into windows.
+
+    @param body         - Raw request body.
+    @param content_type - Request Content-Type header.
+    @param many         - True for /predict/batch (JSON list), False for one window.
+    @raises pydantic.ValidationError for invalid JSON bodies, PayloadError for
+            malformed binary bodies, UnsupportedMediaType otherwise.
+    """
+    kind = media_type(content_type)
+    if kind == JSON:
+        windows = _json_batch.validate_json(body) if many else [SensorWindow.model_validate_json(body)]
+        return [WindowPayload(w.unit_id, w.cycle, RawWindow.from_sensors(w.sensors)) for w in windows]
+    if kind == RAW_FRAME:
+        return decode_frames(body)
+    if kind == ARROW_STREAM:
+        return decode_arrow(body)
+    raise UnsupportedMediaType(f"Unsupported Content-Type '{kind}'; use one of {', '.join(CONTENT_TYPES)}.")
+
+
+def decode_frames(body: bytes) -> list[WindowPayload]:
+    """Decode back-to-back raw frames into zero-copy windows."""
+    view = memoryview(body)
+    out, offset = [], 0
+    while offset < len(view):
+        if offset + _HEADER_LEN.size > len(view):
+            raise PayloadError(f"Truncated frame header at byte {offset}.")
+        (header_len,) = _HEADER_LEN.unpack_from(view, offset)
+        offset += _HEADER_LEN.size
+        if offset + header_len > len(view):
+            raise PayloadError(f"Frame header at byte {offset} declares {header_len} bytes but the body is shorter.")
+        try:
+            header = json.loads(bytes(view[offset:offset + header_len]))
+            columns = header["columns"]
+            rows = int(header["rows"])
+            dtype = _DTYPES[header.get("dtype", "<f4")]
+            unit_id, cycle = str(header["unit_id"]), int(header["cycle"])
+        except (ValueError, KeyError, TypeError) as e:
+            raise PayloadError(f"Bad frame header at byte {offset}: {e}") from None
+        if not isinstance(columns, list) or not columns or not all(isinstance(c, str) for c in columns):
+            raise PayloadError(f"Bad frame header at byte {offset}: 'columns' must be a non-empty list of strings.")
+        if rows < 0:
+            raise PayloadError(f"Bad frame header at byte {offset}: 'rows' must be >= 0, got {rows}.")
+        columns = tuple(columns)
+        offset += header_len
+
+        count = rows * len(columns)
+        if offset + count * dtype.itemsize > len(view):
+            raise PayloadError(f"Frame for unit {unit_id} declares {count} values but the body is shorter.")
+        values = np.frombuffer(body, dtype=dtype, count=count, offset=offset).reshape(rows, len(columns))
+        offset += count * dtype.itemsize
+        out.append(WindowPayload(unit_id, cycle, RawWindow(columns, values)))
+    return out
+
+
+def decode_arrow(body: bytes) -> list[WindowPayload]:
+    """Decode an Arrow IPC stream, one record batch per window."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise UnsupportedMediaType("Arrow payloads need the optional 'pyarrow' package.") from None
+
+    out = []
+    try:
+        reader = pa.ipc.open_stream(pa.py_buffer(body))
+        schema_meta = reader.schema.metadata or {}
+        while True:
+            try:
+                batch, batch_meta = reader.read_next_batch_with_custom_metadata()
+            except StopIteration:
+                break
+            meta = {**schema_meta, **(dict(batch_meta) if batch_meta else {})}
+            columns = tuple(batch.schema.names)
+            # Columnar → row-major needs exactly one copy; each column is read zero-copy.
+            values = np.column_stack([
+                batch.column(i).to_numpy(zero_copy_only=True) for i in range(batch.num_columns)
+            ]) if columns else np.empty((batch.num_rows, 0))
+            out.append(WindowPayload(meta[b"unit_id"].decode(), int(meta[b"cycle"]), RawWindow(columns, values)))
+    except (pa.ArrowException, KeyError, ValueError) as e:
+        raise PayloadError(f"Bad Arrow stream: {e}") from None
+    return out
@@ -13,7 +13,7 @@ class Aircraft(Base):
     id           = Column(Integer, primary_key=True, index=True)
     tail_number  = Column(String, unique=True, nullable=False, index=True)
     model        = Column(String, nullable=False)
-    fleet_id     = Column(String, nullable=True)
+    fleet_id     = Column(String, nullable=True, index=True)
     total_cycles = Column(Integer, default=0)
     created_at   = Column(DateTime, server_default=func.now())
 
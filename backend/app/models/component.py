@@ -1,10 +1,11 @@
 """Component ORM model."""
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.database import Base
+from app.utils.risk_bands import risk_band_rank
 
 
 class Component(Base):
@@ -20,3 +21,10 @@ class Component(Base):
 
     aircraft        = relationship("Aircraft", back_populates="components")
     rul_predictions = relationship("RULPrediction", back_populates="component")
+
+    __table_args__ = (
+        # Covers the per-aircraft GROUP BY in /fleet/summary without touching the table.
+        Index("ix_components_aircraft_band_health", "aircraft_id", "risk_band", "health_index"),
+        # Matches the (severity, id) keyset order of /alerts.
+        Index("ix_components_severity_id", risk_band_rank(risk_band), id),
+    )
@@ -1,6 +1,6 @@
 """RUL prediction ORM model."""
 
-from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -19,3 +19,8 @@ class RULPrediction(Base):
     predicted_at  = Column(DateTime, server_default=func.now())
 
     component = relationship("Component", back_populates="rul_predictions")
+
+    __table_args__ = (
+        # Per-component time-range scans for /fleet/{id}/history and the re-scoring job.
+        Index("ix_rul_predictions_component_time", "component_id", "predicted_at"),
+    )
@@ -0,0 +1,22 @@
+"""RUL rollup ORM model — downsampled rul_predictions."""
+
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, Index
+
+from app.database import Base
+
+
+class RULRollup(Base):
+    __tablename__ = "rul_rollups"
+
+    component_id = Column(Integer, ForeignKey("components.id"), primary_key=True)
+    resolution   = Column(String, primary_key=True)   # hour | day
+    bucket_start = Column(DateTime, primary_key=True)
+    min_rul      = Column(Float, nullable=False)
+    mean_rul     = Column(Float, nullable=False)
+    last_rul     = Column(Float, nullable=False)       # latest prediction in the bucket
+    last_cycle   = Column(Integer, nullable=False)
+    samples      = Column(Integer, nullable=False)    # raw predictions folded into the bucket
+
+    __table_args__ = (
+        Index("ix_rul_rollups_resolution_bucket", "resolution", "bucket_start"),
+    )
@@ -1,31 +1,43 @@
 """Aircraft routes."""
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.aircraft import Aircraft
 from app.models.component import Component
 from app.schemas.aircraft import AircraftCreate, AircraftResponse
 from app.schemas.component import ComponentResponse
+from app.services.response_cache import cached_json
 
 router = APIRouter()
 
+_components_json = TypeAdapter(list[ComponentResponse])
+
 
 @router.get("/{aircraft_id}/components", response_model=list[ComponentResponse])
-def get_components(aircraft_id: int, db: Session = Depends(get_db)):
-    """Return all components with health index and risk band for an aircraft."""
-    aircraft = db.query(Aircraft).filter(Aircraft.id == aircraft_id).first()
-    if not aircraft:
-        raise HTTPException(status_code=404, detail="Aircraft not found")
-    return db.query(Component).filter(Component.aircraft_id == aircraft_id).all()
+async def get_components(aircraft_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Return all components with health index and risk band for an aircraft.
+
+    Served from the response cache with an ETag; `304` when If-None-Match still matches.
+    """
+    async def compute() -> bytes:
+        aircraft = await db.get(Aircraft, aircraft_id)
+        if not aircraft:
+            raise HTTPException(status_code=404, detail="Aircraft not found")
+        components = (await db.scalars(select(Component).where(Component.aircraft_id == aircraft_id))).all()
+        return _components_json.dump_json(_components_json.validate_python(components, from_attributes=True))
+
+    return await cached_json(request, ("components", aircraft_id), aircraft_id, compute)
 
 
 @router.post("/", response_model=AircraftResponse, status_code=201)
-def register_aircraft(payload: AircraftCreate, db: Session = Depends(get_db)):
+async def register_aircraft(payload: AircraftCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new aircraft."""
     aircraft = Aircraft(**payload.model_dump())
     db.add(aircraft)
-    db.commit()
-    db.refresh(aircraft)
+    await db.commit()
+    await db.refresh(aircraft)
     return aircraft
@@ -1,27 +1,80 @@
 """Maintenance alert routes."""
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_read_db
+from app.models.aircraft import Aircraft
 from app.models.component import Component
-from app.services.risk_service import should_alert
+from app.services.risk_service import alert_condition
+from app.utils.risk_bands import risk_band_rank
 
 router = APIRouter()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _parse_cursor(cursor: str) -> tuple[int, int]:
+    """Split an `X-Next-Cursor` value ("<severity>:<component_id>") into its keys."""
+    try:
+        severity, component_id = cursor.split(":")
+        return int(severity), int(component_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Malformed cursor '{cursor}'.") from None
+
 
 @router.get("", include_in_schema=False)
 @router.get("/")
-def get_alerts(db: Session = Depends(get_db)):
-    """Return all components in an actionable risk band (MEDIUM / HIGH / CRITICAL)."""
+async def get_alerts(
+    response: Response,
+    fleet_id: str | None = None,
+    component_type: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Return components in an actionable risk band, most severe first.
+
+    Pages are ordered by (severity, component id); when more remain, the
+    `X-Next-Cursor` response header holds the `cursor` for the next page.
+    @param fleet_id       - Only components on aircraft in this fleet.
+    @param component_type - Only components of this type.
+    @param limit          - Page size.
+    @param cursor         - `X-Next-Cursor` value from the previous page.
+    """
+    severity = risk_band_rank(Component.risk_band)
+    stmt = (
+        select(
+            Component.id,
+            Component.aircraft_id,
+            Component.name,
+            Component.risk_band,
+            Component.health_index,
+            severity,
+        )
+        .where(alert_condition(Component.health_index))
+        .order_by(severity, Component.id)
+        .limit(limit + 1)
+    )
+    if fleet_id is not None:
+        stmt = stmt.join(Aircraft, Aircraft.id == Component.aircraft_id).where(Aircraft.fleet_id == fleet_id)
+    if component_type is not None:
+        stmt = stmt.where(Component.component_type == component_type)
+    if cursor is not None:
+        stmt = stmt.where(tuple_(severity, Component.id) > tuple_(*_parse_cursor(cursor)))
+
+    rows = (await db.execute(stmt)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = f"{rows[-1][5]}:{rows[-1][0]}"
     return [
         {
-            "component_id": c.id,
-            "aircraft_id": c.aircraft_id,
-            "name": c.name,
-            "risk_band": c.risk_band,
-            "health_index": c.health_index,
+            "component_id": component_id,
+            "aircraft_id": aircraft_id,
+            "name": name,
+            "risk_band": risk_band,
+            "health_index": health_index,
         }
-        for c in db.query(Component).all()
-        if should_alert(c.health_index)
+        for component_id, aircraft_id, name, risk_band, health_index, _ in rows
     ]
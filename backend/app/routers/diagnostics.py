@@ -0,0 +1,68 @@
+"""Runtime diagnostics routes — inference scheduler and service internals."""
+
+from fastapi import APIRouter
+
+from app.database import replica_stats
+from app.ml.inference import batcher_stats, cache_stats
+from app.ml.loader import model_stats
+from app.services.prediction_writer import writer_stats
+from app.services.rescoring_service import rescore_stats
+from app.services.response_cache import response_cache_stats
+from app.services.retention_service import retention_stats
+from app.startup import startup_report
+
+router = APIRouter()
+
+
+@router.get("/scheduler")
+def scheduler_stats():
+    """Return micro-batcher queue depth and batch-size / queue-wait histograms."""
+    return batcher_stats()
+
+
+@router.get("/cache")
+def cache():
+    """Return prediction cache size, hit rate and eviction / invalidation counts."""
+    return cache_stats()
+
+
+@router.get("/response-cache")
+def response_cache():
+    """Return fleet summary / components response cache hit rate, 304s and recompute time."""
+    return response_cache_stats()
+
+
+@router.get("/models")
+def models():
+    """Return indexed model artifacts with load time, resident size and residency."""
+    return model_stats()
+
+
+@router.get("/writer")
+def writer():
+    """Return write-behind queue depth, lag of the oldest queued prediction and flush counts."""
+    return writer_stats()
+
+
+@router.get("/rescore")
+def rescore():
+    """Return fleet re-scoring job runs, last duration and components scored / changed."""
+    return rescore_stats()
+
+
+@router.get("/retention")
+def retention():
+    """Return partitioning state, retention policy and the last rollup / prune run."""
+    return retention_stats()
+
+
+@router.get("/replica")
+def replica():
+    """Return read-replica health, replay lag and replica / primary read counts."""
+    return replica_stats()
+
+
+@router.get("/startup")
+def startup():
+    """Return total startup time and the per-phase breakdown in milliseconds."""
+    return startup_report()
@@ -1,50 +1,141 @@
 """Fleet aggregation routes."""
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from typing import Literal
 
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db, get_read_db
 from app.models.aircraft import Aircraft
 from app.models.component import Component
 from app.schemas.rul import FleetSummaryItem
+from app.services.response_cache import cached_json
+from app.services.retention_service import history_resolution
+from app.services.rul_service import history_page, history_statement, stream_history
+from app.utils.risk_bands import RISK_BANDS, risk_band_rank
 
 router = APIRouter()
 
-_BAND_ORDER = ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+RESOLUTION_HEADER = "X-History-Resolution"
+
+_summary_json = TypeAdapter(list[FleetSummaryItem])
 
 
 @router.get("/summary", response_model=list[FleetSummaryItem])
-def fleet_summary(db: Session = Depends(get_db)):
-    """Return health summary for every aircraft in the fleet."""
-    result = []
-    for aircraft in db.query(Aircraft).all():
-        components = db.query(Component).filter(Component.aircraft_id == aircraft.id).all()
-        if not components:
-            continue
-        worst = min(
-            [c.risk_band for c in components],
-            key=lambda b: _BAND_ORDER.index(b) if b in _BAND_ORDER else 99,
+async def fleet_summary(
+    request: Request,
+    fleet_id: str | None = None,
+    limit: int | None = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Return health summary per aircraft, ordered by aircraft id.
+
+    One GROUP BY over components joined to aircraft; aircraft without
+    components are omitted. Served from the response cache with an ETag;
+    `304` when If-None-Match still matches.
+    @param fleet_id - Only aircraft in this fleet.
+    @param limit    - Page size (default: all aircraft).
+    @param offset   - Aircraft to skip.
+    """
+    async def compute() -> bytes:
+        worst_rank = func.min(risk_band_rank(Component.risk_band))
+        stmt = (
+            select(
+                Aircraft.id,
+                Aircraft.tail_number,
+                func.min(Component.health_index),
+                worst_rank,
+                func.min(Component.risk_band),
+                func.count(),
+            )
+            .join(Component, Component.aircraft_id == Aircraft.id)
+            .group_by(Aircraft.id, Aircraft.tail_number)
+            .order_by(Aircraft.id)
+            .offset(offset)
+            .limit(limit)
         )
-        result.append(FleetSummaryItem(
-            aircraft_id=aircraft.id,
-            tail_number=aircraft.tail_number,
-            min_rul=min(c.health_index for c in components),
-            worst_risk_band=worst,
-            component_count=len(components),
-        ))
-    return result
+        if fleet_id is not None:
+            stmt = stmt.where(Aircraft.fleet_id == fleet_id)
+
+        return _summary_json.dump_json([
+            FleetSummaryItem(
+                aircraft_id=aircraft_id,
+                tail_number=tail_number,
+                min_rul=min_health,
+                # Bands outside RISK_BANDS only win when no component has a known band.
+                worst_risk_band=RISK_BANDS[rank] if rank < len(RISK_BANDS) else any_band,
+                component_count=count,
+            )
+            for aircraft_id, tail_number, min_health, rank, any_band, count in await db.execute(stmt)
+        ])
+
+    return await cached_json(request, ("summary", fleet_id, limit, offset), None, compute)
 
 
 @router.get("/{aircraft_id}/history")
-def fleet_history(aircraft_id: int, db: Session = Depends(get_db)):
-    """Return all RUL predictions for every component on an aircraft."""
-    from app.models.rul_prediction import RULPrediction
-    component_ids = [
-        c.id for c in db.query(Component).filter(Component.aircraft_id == aircraft_id).all()
-    ]
-    return (
-        db.query(RULPrediction)
-        .filter(RULPrediction.component_id.in_(component_ids))
-        .order_by(RULPrediction.predicted_at)
-        .all()
-    )
+async def fleet_history(
+    aircraft_id: int,
+    response: Response,
+    component_id: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    cursor: str | None = None,
+    format: Literal["json", "ndjson", "csv"] = "json",
+    resolution: Literal["auto", "raw", "hour", "day"] = "auto",
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Return the aircraft's RUL history, raw or rolled up, in time order.
+
+    `json` returns one page; the `X-Next-Cursor` response header holds the
+    `cursor` for the next one. `ndjson` and `csv` stream every matching row
+    from `cursor` onward, ignoring `limit`. `X-History-Resolution` reports
+    which resolution was read.
+    @param component_id - Only this component.
+    @param start        - Only predictions at or after this time (naive = UTC).
+    @param end          - Only predictions before this time (naive = UTC).
+    @param limit        - Page size for `json`.
+    @param cursor       - `X-Next-Cursor` value from the previous page.
+    @param format       - `json`, `ndjson` or `csv`.
+    @param resolution   - `raw` predictions, `hour` / `day` rollups, or `auto` by range length.
+    """
+    if await db.get(Aircraft, aircraft_id) is None:
+        raise HTTPException(status_code=404, detail="Aircraft not found")
+    start, end = _naive_utc(start), _naive_utc(end)
+    if resolution == "auto":
+        resolution = history_resolution(start, end)
+    after = _parse_history_cursor(cursor) if cursor is not None else None
+    stmt = history_statement(aircraft_id, component_id, start, end, after, resolution, db.bind.dialect.name)
+    headers = {RESOLUTION_HEADER: resolution}
+
+    if format != "json":
+        media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+        return StreamingResponse(stream_history(stmt, format, db.bind), media_type=media_type, headers=headers)
+
+    rows, after = await history_page(stmt, limit, resolution, db)
+    response.headers.update(headers)
+    if after is not None:
+        response.headers[NEXT_CURSOR_HEADER] = f"{after[0].isoformat()},{after[1]}"
+    return rows
+
+
+def _parse_history_cursor(cursor: str) -> tuple[datetime, int]:
+    """Split a history cursor ("<timestamp ISO>,<id>") into its keys."""
+    try:
+        predicted_at, prediction_id = cursor.split(",")
+        return _naive_utc(datetime.fromisoformat(predicted_at)), int(prediction_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Malformed cursor '{cursor}'.") from None
+
+
+def _naive_utc(value: datetime | None) -> datetime | None:
+    """Convert an offset-aware timestamp to naive UTC, the form stored in the database."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
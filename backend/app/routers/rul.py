@@ -1,16 +1,124 @@
-"""RUL inference routes."""
+"""RUL inference routes.
 
-from fastapi import APIRouter, Depends
+Both prediction routes negotiate the request body on Content-Type: JSON
+(`SensorWindow`), raw float frames or an Arrow IPC stream — see `app.ml.wire`.
+`/stream` is a WebSocket for per-reading ingestion (`app.services.stream_service`).
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.database import get_db
+from app.ml import wire
 from app.schemas.rul import RULResponse, SensorWindow
-from app.services.rul_service import run_rul_inference
+from app.services.prediction_writer import WriterBackpressure
+from app.services.rul_service import run_rul_batch_inference, run_rul_inference
+from app.services.stream_service import StreamSession, parse_message, score_and_persist, unit_features
 
 router = APIRouter()
 
 
-@router.post("/predict", response_model=RULResponse)
-def predict_rul(payload: SensorWindow, db: Session = Depends(get_db)):
+def _request_body(schema: dict) -> dict:
+    """OpenAPI requestBody listing the JSON schema and the binary alternatives."""
+    binary = {"schema": {"type": "string", "format": "binary"}}
+    return {"requestBody": {"required": True, "content": {
+        wire.JSON: {"schema": schema},
+        wire.RAW_FRAME: binary,
+        wire.ARROW_STREAM: binary,
+    }}}
+
+
+async def _decode(request: Request, many: bool) -> list[wire.WindowPayload]:
+    body = await request.body()
+    try:
+        return wire.decode(body, request.headers.get("content-type"), many)
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)])
+    except wire.UnsupportedMediaType as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except wire.PayloadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _backpressure(e: WriterBackpressure) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+async def one_window(request: Request) -> wire.WindowPayload:
+    windows = await _decode(request, many=False)
+    if len(windows) != 1:
+        raise HTTPException(status_code=400, detail=f"Expected one window, got {len(windows)}.")
+    return windows[0]
+
+
+async def many_windows(request: Request) -> list[wire.WindowPayload]:
+    windows = await _decode(request, many=True)
+    if len(windows) > settings.rul_batch_max_size:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch of {len(windows)} windows exceeds the limit of {settings.rul_batch_max_size}.",
+        )
+    return windows
+
+
+@router.post(
+    "/predict",
+    response_model=RULResponse,
+    openapi_extra=_request_body(SensorWindow.model_json_schema()),
+)
+def predict_rul(payload: wire.WindowPayload = Depends(one_window), db: Session = Depends(get_db)):
     """Run RUL inference and return a risk-classified prediction."""
-    return run_rul_inference(payload, db)
+    try:
+        return run_rul_inference(payload, db)
+    except WriterBackpressure as e:
+        raise _backpressure(e)
+
+
+@router.post(
+    "/predict/batch",
+    response_model=list[RULResponse],
+    openapi_extra=_request_body({"type": "array", "items": SensorWindow.model_json_schema()}),
+)
+def predict_rul_batch(payload: list[wire.WindowPayload] = Depends(many_windows), db: Session = Depends(get_db)):
+    """Run RUL inference on many windows in one call; results keep request order."""
+    try:
+        return run_rul_batch_inference(payload, db)
+    except WriterBackpressure as e:
+        raise _backpressure(e)
+
+
+@router.websocket("/stream")
+async def stream_rul(ws: WebSocket):
+    """Ingest readings per component and push a prediction whenever one is triggered."""
+    await ws.accept()
+    session = StreamSession()
+    try:
+        while True:
+            message = await ws.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            try:
+                due = parse_message(session, message["bytes"] if message.get("bytes") is not None else message["text"])
+            except ValueError as e:
+                await ws.send_json({"type": "error", "detail": str(e)})
+                continue
+            for payload, trigger in due:
+                try:
+                    result = await run_in_threadpool(score_and_persist, payload)
+                except WriterBackpressure as e:
+                    await ws.send_json({"type": "error", "unit_id": payload.unit_id, "detail": str(e)})
+                    continue
+                except Exception as e:
+                    # Bad unit_id, unknown component, database error: fail this prediction, keep the session.
+                    print(f"[stream] Prediction for unit {payload.unit_id} failed: {e}")
+                    await ws.send_json({"type": "error", "unit_id": payload.unit_id,
+                                        "detail": f"Prediction failed: {e}"})
+                    continue
+                await ws.send_json({"type": "prediction", "trigger": trigger, **result.model_dump(),
+                                    "features": unit_features(payload.unit_id)})
+    except WebSocketDisconnect:
+        pass
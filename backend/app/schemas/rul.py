@@ -1,6 +1,6 @@
 """RUL inference request / response schemas."""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class SensorWindow(BaseModel):
@@ -9,12 +9,25 @@ class SensorWindow(BaseModel):
     sensors: dict[str, list[float]]  # sensor_name -> readings
 
 
+class StreamSample(BaseModel):
+    unit_id: str
+    cycle: int
+    sensors: dict[str, float | list[float]]  # one reading, or several consecutive ones
+
+
+class StreamConfig(BaseModel):
+    stride: int | None = Field(None, ge=1)    # new samples between scheduled predictions
+    thresholds: dict[str, float] | None = None  # sensor -> value whose upward crossing triggers a prediction
+
+
 class RULResponse(BaseModel):
     unit_id: str
     cycle: int
     predicted_rul: float
     risk_band: str
     confidence: float
+    members: list[str] = []  # ensemble members that contributed to predicted_rul
+    model_version: str = "stub-v0"
 
 
 class FleetSummaryItem(BaseModel):
@@ -0,0 +1,247 @@
+"""Write-behind persistence of RUL predictions.
+
+With `prediction_write_behind` enabled, scoring requests hand their
+RULPrediction rows to a bounded in-memory queue and return without waiting
+for a commit. One writer thread flushes the queue in bulk — one multi-row
+INSERT per `prediction_writer_flush_size` rows — as soon as that many are
+queued or the oldest row has waited `prediction_writer_flush_interval_ms`.
+
+The queue holds at most `prediction_writer_queue_size` rows. When the
+database falls behind and the queue is full, `enqueue` waits up to
+`prediction_writer_enqueue_timeout_ms` for room and then raises
+`WriterBackpressure` (surfaced as 503). A flush that fails on a transient
+database error (connection lost, database unavailable) keeps its rows and
+retries. One that fails on the data itself is bisected: the good rows are
+written and each row that fails on its own is dropped and counted as
+dead-lettered, so one bad row cannot stall the queue. `stop` flushes
+everything still queued.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.rul_prediction import RULPrediction
+
+# Longest pause between retries of a failing flush.
+_MAX_RETRY_BACKOFF_S = 5.0
+
+
+class WriterBackpressure(RuntimeError):
+    """Raised when the write-behind queue stays full past the enqueue timeout."""
+
+
+def _transient(e: Exception) -> bool:
+    """True for errors worth retrying unchanged: the database, not the rows, is at fault."""
+    return isinstance(e, OperationalError) or (isinstance(e, DBAPIError) and e.connection_invalidated)
+
+
+class PredictionWriter:
+    """Bounded queue of RULPrediction rows drained by one bulk-inserting thread.
+
+    @param max_queue          - Rows held in memory before callers are pushed back.
+    @param flush_size         - Rows per INSERT; reaching it triggers a flush.
+    @param flush_interval_ms  - Longest a queued row waits before a flush.
+    @param enqueue_timeout_ms - How long `enqueue` waits for room in a full queue.
+    """
+
+    def __init__(self, max_queue: int = 50_000, flush_size: int = 1000,
+                 flush_interval_ms: float = 200.0, enqueue_timeout_ms: float = 100.0):
+        self.max_queue = max(1, max_queue)
+        self.flush_size = max(1, min(flush_size, self.max_queue))
+        self.flush_interval_s = max(0.0, flush_interval_ms) / 1000.0
+        self.enqueue_timeout_s = max(0.0, enqueue_timeout_ms) / 1000.0
+        self._rows: deque[tuple[float, dict]] = deque()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+        self.enqueued = 0
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dead_lettered = 0
+        self.rejected = 0
+        self.last_flush_ms: float | None = None
+        self.last_error: str | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the writer thread; no-op if already running."""
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="ifrpm-prediction-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Flush every queued row and stop the writer thread."""
+        if not self.running:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+        if self._rows:
+            print(f"[writer] {len(self._rows)} predictions not persisted at shutdown")
+
+    def enqueue(self, rows: list[dict]) -> None:
+        """Queue rows for insertion; raises WriterBackpressure if no room frees up in time."""
+        if len(rows) > self.max_queue:
+            raise ValueError(f"{len(rows)} rows exceed the write-behind queue size of {self.max_queue}.")
+        deadline = time.monotonic() + self.enqueue_timeout_s
+        with self._cond:
+            while len(self._rows) + len(rows) > self.max_queue:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stopping:
+                    self.rejected += len(rows)
+                    raise WriterBackpressure(
+                        f"Prediction write queue full ({len(self._rows)}/{self.max_queue} rows); retry later."
+                    )
+                self._cond.wait(remaining)
+            now = time.monotonic()
+            self._rows.extend((now, row) for row in rows)
+            self.enqueued += len(rows)
+            if len(self._rows) >= self.flush_size:
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """Return queue depth, lag of the oldest queued row and flush counters."""
+        with self._cond:
+            oldest = self._rows[0][0] if self._rows else None
+            return {
+                "running": self.running,
+                "queue_depth": len(self._rows),
+                "max_queue": self.max_queue,
+                "lag_ms": round((time.monotonic() - oldest) * 1000.0, 1) if oldest is not None else 0.0,
+                "flush_size": self.flush_size,
+                "flush_interval_ms": self.flush_interval_s * 1000.0,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "flushes": self.flushes,
+                "last_flush_ms": self.last_flush_ms,
+                "rejected": self.rejected,
+                "failures": self.failures,
+                "dead_lettered": self.dead_lettered,
+                "last_error": self.last_error,
+            }
+
+    def _run(self) -> None:
+        backoff = 0.0
+        while True:
+            with self._cond:
+                while not self._due():
+                    self._cond.wait(self._wait_s())
+                if self._stopping and not self._rows:
+                    return
+                batch = [row for _, row in islice(self._rows, self.flush_size)]
+
+            done = self._flush(batch)
+            if done:
+                with self._cond:
+                    for _ in range(done):
+                        self._rows.popleft()
+                    self._cond.notify_all()
+            if done == len(batch):
+                backoff = 0.0
+            else:
+                # Transient failure: retry the rest, also while stopping; stop()'s join timeout bounds shutdown.
+                backoff = min(_MAX_RETRY_BACKOFF_S, max(0.1, backoff * 2))
+                time.sleep(backoff)
+
+    def _due(self) -> bool:
+        if self._stopping or len(self._rows) >= self.flush_size:
+            return True
+        return bool(self._rows) and time.monotonic() - self._rows[0][0] >= self.flush_interval_s
+
+    def _wait_s(self) -> float | None:
+        if not self._rows:
+            return None
+        return max(0.0, self._rows[0][0] + self.flush_interval_s - time.monotonic())
+
+    def _flush(self, batch: list[dict]) -> int:
+        """Insert a batch; return how many leading rows are done (written or dead-lettered)."""
+        started = time.perf_counter()
+        done = self._insert(batch)
+        if done:
+            self.flushes += 1
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000.0, 2)
+        return done
+
+    def _insert(self, rows: list[dict]) -> int:
+        """Insert rows in one transaction, bisecting on data errors; return the leading rows done."""
+        try:
+            with SessionLocal() as db:
+                db.execute(insert(RULPrediction), rows)
+                db.commit()
+        except Exception as e:
+            reason = str(getattr(e, "orig", None) or e)
+            self.failures += 1
+            self.last_error = reason
+            if _transient(e):
+                print(f"[writer] Flush of {len(rows)} predictions failed, will retry: {reason}")
+                return 0
+            if len(rows) == 1:
+                self.dead_lettered += 1
+                print(f"[writer] Dropped prediction for component {rows[0].get('component_id')}: {reason}")
+                return 1
+            mid = len(rows) // 2
+            done = self._insert(rows[:mid])
+            return done if done < mid else mid + self._insert(rows[mid:])
+        self.written += len(rows)
+        return len(rows)
+
+
+_writer: PredictionWriter | None = None
+
+
+def start_writer() -> None:
+    """Start the write-behind writer if enabled in settings."""
+    global _writer
+    if not settings.prediction_write_behind or (_writer is not None and _writer.running):
+        return
+    _writer = PredictionWriter(
+        max_queue=settings.prediction_writer_queue_size,
+        flush_size=settings.prediction_writer_flush_size,
+        flush_interval_ms=settings.prediction_writer_flush_interval_ms,
+        enqueue_timeout_ms=settings.prediction_writer_enqueue_timeout_ms,
+    )
+    _writer.start()
+
+
+def stop_writer() -> None:
+    """Flush queued predictions and stop the writer."""
+    if _writer is not None:
+        _writer.stop()
+
+
+def persist_predictions(rows: list[dict], db: Session) -> None:
+    """Store RULPrediction rows: queued write-behind when the writer runs, else inserted and committed now.
+
+    @raises WriterBackpressure when the write-behind queue is full.
+    """
+    if _writer is not None and _writer.running:
+        # Stamp now: the server default would record flush time instead.
+        queued_at = datetime.utcnow()
+        _writer.enqueue([{"predicted_at": queued_at, **row} for row in rows])
+        return
+    db.execute(insert(RULPrediction), rows)
+    db.commit()
+
+
+def writer_stats() -> dict:
+    """Return write-behind queue depth, lag and flush counters (empty when disabled)."""
+    if _writer is None:
+        return {"running": False}
+    return _writer.stats()
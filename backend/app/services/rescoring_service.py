@@ -0,0 +1,166 @@
+"""Fleet re-scoring — keeps Component.health_index / risk_band current.
+
+A background thread wakes every `rescore_interval_s`, splits the component
+ids into chunks of `rescore_chunk_size` and re-scores the chunks on
+`rescore_workers` threads. Each chunk pulls every component's latest
+RULPrediction in one query (an index lookup per component), derives health
+index and risk band for the whole chunk with NumPy, and writes back only the
+rows that changed with a single bulk UPDATE by primary key, invalidating the
+cached responses of the aircraft whose components changed.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.component import Component
+from app.models.rul_prediction import RULPrediction
+from app.services.response_cache import invalidate_on_commit
+from app.services.risk_service import classify_risk_bands, rul_health_index
+
+_lock = threading.Lock()
+_stats = {
+    "runs": 0,
+    "failures": 0,
+    "last_run_at": None,
+    "last_duration_ms": None,
+    "last_components": None,
+    "last_changed": None,
+    "last_error": None,
+}
+
+_scheduler: threading.Thread | None = None
+_scheduler_stop = threading.Event()
+
+
+def _latest_predictions(db: Session, first_id: int, last_id: int):
+    """Return (component id, aircraft id, health_index, risk_band, latest predicted_rul) rows for an id range.
+
+    Per component, max(predicted_at) and the row at that time are both index
+    lookups on ix_rul_predictions_component_time, so the cost follows the
+    number of components rather than the size of the prediction history.
+    Components without predictions are left out.
+    """
+    at = aliased(RULPrediction)
+    latest_at = (
+        select(func.max(at.predicted_at))
+        .where(at.component_id == Component.id)
+        .correlate(Component)
+        .scalar_subquery()
+    )
+    latest_rul = (
+        select(RULPrediction.predicted_rul)
+        .where(RULPrediction.component_id == Component.id, RULPrediction.predicted_at == latest_at)
+        .order_by(RULPrediction.id.desc())
+        .limit(1)
+        .correlate(Component)
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        select(Component.id, Component.aircraft_id, Component.health_index, Component.risk_band,
+               latest_rul.label("predicted_rul"))
+        .where(Component.id.between(first_id, last_id))
+    ).all()
+    return [row for row in rows if row.predicted_rul is not None]
+
+
+def rescore_chunk(first_id: int, last_id: int) -> tuple[int, int]:
+    """Re-score components with ids in [first_id, last_id]; return (scored, changed)."""
+    with SessionLocal() as db:
+        rows = _latest_predictions(db, first_id, last_id)
+        if not rows:
+            return 0, 0
+        ids, aircraft_ids, health, bands, ruls = zip(*rows)
+        ids = np.asarray(ids)
+        new_health = rul_health_index(np.asarray(ruls, dtype=float))
+        new_bands = classify_risk_bands(ruls)
+        # Tolerance absorbs last-digit rounding differences; NULL health (NaN) always counts as changed.
+        changed = ~np.isclose(new_health, np.asarray(health, dtype=float), rtol=0.0, atol=1e-9) \
+            | (new_bands != np.asarray(bands, dtype=object))
+        if changed.any():
+            db.execute(update(Component), [
+                {"id": int(i), "health_index": float(h), "risk_band": str(b)}
+                for i, h, b in zip(ids[changed], new_health[changed], new_bands[changed])
+            ])
+            invalidate_on_commit(db, np.unique(np.asarray(aircraft_ids)[changed]).tolist())
+            db.commit()
+        return len(rows), int(changed.sum())
+
+
+def rescore_fleet(chunk_size: int | None = None, workers: int | None = None) -> dict:
+    """Re-score every component once and return the run's duration and row counts.
+
+    @param chunk_size - Components per chunk (default `rescore_chunk_size`).
+    @param workers    - Chunks scored concurrently (default `rescore_workers`).
+    """
+    chunk_size = chunk_size or settings.rescore_chunk_size
+    workers = workers or settings.rescore_workers
+    started = time.perf_counter()
+    try:
+        with SessionLocal() as db:
+            ids = db.scalars(select(Component.id).order_by(Component.id)).all()
+        chunks = [(ids[i], ids[min(i + chunk_size, len(ids)) - 1]) for i in range(0, len(ids), chunk_size)]
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ifrpm-rescore") as pool:
+            results = list(pool.map(lambda c: rescore_chunk(*c), chunks))
+    except Exception as e:
+        with _lock:
+            _stats["failures"] += 1
+            _stats["last_error"] = str(e)
+        raise
+
+    run = {
+        "duration_ms": round((time.perf_counter() - started) * 1000.0, 1),
+        "chunks": len(chunks),
+        "components": sum(scored for scored, _ in results),
+        "changed": sum(changed for _, changed in results),
+    }
+    with _lock:
+        _stats["runs"] += 1
+        _stats["last_run_at"] = time.time()
+        _stats["last_duration_ms"] = run["duration_ms"]
+        _stats["last_components"] = run["components"]
+        _stats["last_changed"] = run["changed"]
+        _stats["last_error"] = None
+    return run
+
+
+def start_scheduler() -> None:
+    """Run `rescore_fleet` every `rescore_interval_s` on a background thread."""
+    global _scheduler
+    if settings.rescore_interval_s <= 0 or (_scheduler is not None and _scheduler.is_alive()):
+        return
+    _scheduler_stop.clear()
+
+    def _loop() -> None:
+        while not _scheduler_stop.wait(settings.rescore_interval_s):
+            try:
+                run = rescore_fleet()
+                if run["changed"]:
+                    print(f"[rescore] {run['changed']}/{run['components']} components updated "
+                          f"in {run['duration_ms']:.0f} ms")
+            except Exception as e:
+                print(f"[rescore] Fleet re-score failed: {e}")
+
+    _scheduler = threading.Thread(target=_loop, name="ifrpm-rescore", daemon=True)
+    _scheduler.start()
+
+
+def stop_scheduler() -> None:
+    """Stop the re-scoring scheduler."""
+    _scheduler_stop.set()
+
+
+def rescore_stats() -> dict:
+    """Return run counts plus the last run's duration and scored / changed rows."""
+    with _lock:
+        return {
+            "running": _scheduler is not None and _scheduler.is_alive(),
+            "interval_s": settings.rescore_interval_s,
+            **_stats,
+        }
@@ -0,0 +1,296 @@
+"""Response cache for the dashboard aggregates (fleet summary, aircraft components).
+
+Serialized JSON bodies are cached per route and query parameters, together
+with an ETag derived from the body, so every API worker hands out the same
+ETag for the same content and an unchanged poll is answered `304` without a
+body. Entries are evicted least-recently-used beyond `response_cache_size`
+and expire after `response_cache_ttl_s`.
+
+Writers call `invalidate_on_commit(db, aircraft_ids)` inside the transaction
+that changes Component rows. Once it commits, entries for those aircraft and
+every fleet-wide entry are dropped in this process. On PostgreSQL the same
+transaction issues a NOTIFY on `CHANNEL`; each worker's listener thread
+receives it after commit and drops the same entries, so invalidation reaches
+the other worker processes. Without PostgreSQL the TTL bounds how long other
+processes can serve stale entries.
+
+Cached routes compute misses on the primary (`get_async_db`), never the read
+replica: a miss right after an invalidation would otherwise cache rows the
+replica has not replayed yet, and keep serving them until the TTL expires.
+"""
+
+import hashlib
+import select as _select
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+
+from fastapi import Request, Response
+from sqlalchemy import event, func
+from sqlalchemy import select as sql_select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import engine
+
+CHANNEL = "ifrpm_response_cache"
+# NOTIFY payloads are limited to 8000 bytes; larger id sets invalidate everything.
+_MAX_NOTIFY_IDS = 500
+_ALL = "*"
+_PENDING_KEY = "response_cache_invalidate"
+_MAX_RECONNECT_BACKOFF_S = 30.0
+
+
+def body_etag(body: bytes) -> str:
+    """Return a strong ETag for a response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class ResponseCache:
+    """Thread-safe LRU + TTL map from (route, params) to a serialized body and its ETag.
+
+    Every entry has a scope: an aircraft id, or None for fleet-wide results
+    that any aircraft's change can affect.
+
+    @param max_entries - Entries kept before least-recently-used eviction (0 disables caching).
+    @param ttl_s       - Seconds an entry stays valid (0 = until invalidated).
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_s: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: OrderedDict[tuple, tuple[float, int | None, bytes, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.recomputes = 0
+        self.recompute_ms_total = 0.0
+        self.recompute_ms_max = 0.0
+        self.last_recompute_ms: float | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: tuple) -> tuple[bytes, str] | None:
+        """Return (body, etag) for key, or None."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            stored_at, _, body, etag = item
+            if self.ttl_s > 0 and time.monotonic() - stored_at > self.ttl_s:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body, etag
+
+    def put(self, key: tuple, scope: int | None, body: bytes, generation: int, recompute_ms: float) -> str:
+        """Store a freshly computed body and return its ETag.
+
+        Not stored when an invalidation arrived since `generation` was read:
+        the body may predate the change.
+        """
+        etag = body_etag(body)
+        with self._lock:
+            self.recomputes += 1
+            self.recompute_ms_total += recompute_ms
+            self.recompute_ms_max = max(self.recompute_ms_max, recompute_ms)
+            self.last_recompute_ms = round(recompute_ms, 2)
+            if not self.enabled or generation != self.generation:
+                return etag
+            self._entries[key] = (time.monotonic(), scope, body, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return etag
+
+    def count_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def invalidate(self, aircraft_ids: Iterable[int] | None = None) -> None:
+        """Drop fleet-wide entries and those of `aircraft_ids` (None = every entry)."""
+        ids = None if aircraft_ids is None else set(aircraft_ids)
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            if ids is None:
+                self._entries.clear()
+                return
+            for key in [k for k, (_, scope, _, _) in self._entries.items() if scope is None or scope in ids]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        """Return size, hit rate, 304 count and recompute timings."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "recomputes": self.recomputes,
+                "recompute_ms_mean": round(self.recompute_ms_total / self.recomputes, 2) if self.recomputes else None,
+                "recompute_ms_max": round(self.recompute_ms_max, 2),
+                "last_recompute_ms": self.last_recompute_ms,
+            }
+
+
+_cache = ResponseCache(settings.response_cache_size, settings.response_cache_ttl_s)
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+async def cached_json(request: Request, key: tuple, scope: int | None,
+                      compute: Callable[[], Awaitable[bytes]]) -> Response:
+    """Serve a JSON body from the cache, recomputing it on a miss; `304` when If-None-Match matches.
+
+    @param key     - Route name plus every query parameter that shapes the body.
+    @param scope   - Aircraft the body depends on; None if it spans the fleet.
+    @param compute - Builds the serialized body; exceptions (e.g. 404) pass through uncached.
+    """
+    cached = _cache.get(key) if _cache.enabled else None
+    if cached is None:
+        generation = _cache.generation
+        started = time.perf_counter()
+        body = await compute()
+        etag = _cache.put(key, scope, body, generation, (time.perf_counter() - started) * 1000.0)
+    else:
+        body, etag = cached
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _matches(request.headers.get("if-none-match"), etag):
+        _cache.count_not_modified()
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def invalidate_on_commit(db: Session, aircraft_ids: Iterable[int]) -> None:
+    """Invalidate cached responses for `aircraft_ids` once `db`'s transaction commits.
+
+    Call before commit. On PostgreSQL also queues a NOTIFY in the same
+    transaction so other workers invalidate too.
+    """
+    ids = set(aircraft_ids)
+    if not ids:
+        return
+    db.info.setdefault(_PENDING_KEY, set()).update(ids)
+    if db.get_bind().dialect.name == "postgresql":
+        payload = _ALL if len(ids) > _MAX_NOTIFY_IDS else ",".join(map(str, sorted(ids)))
+        db.execute(sql_select(func.pg_notify(CHANNEL, payload)))
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    ids = session.info.pop(_PENDING_KEY, None)
+    if ids:
+        _cache.invalidate(None if len(ids) > _MAX_NOTIFY_IDS else ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+_listener: threading.Thread | None = None
+_listener_stop = threading.Event()
+_listener_stats = {"connected": False, "notifications": 0, "reconnects": 0, "last_error": None}
+
+
+def _handle(payload: str) -> None:
+    _listener_stats["notifications"] += 1
+    if payload == _ALL:
+        _cache.invalidate(None)
+    else:
+        _cache.invalidate(int(i) for i in payload.split(",") if i)
+
+
+def _listen() -> None:
+    backoff = 0.0
+    while not _listener_stop.is_set():
+        conn = None
+        try:
+            conn = engine.raw_connection()
+            # A LISTENing connection must never go back to the pool.
+            conn.detach()
+            pg = conn.driver_connection
+            pg.autocommit = True
+            pg.cursor().execute(f"LISTEN {CHANNEL}")
+            if _listener_stats["reconnects"]:
+                # Notifications sent while disconnected are lost.
+                _cache.invalidate(None)
+            _listener_stats["connected"] = True
+            _listener_stats["last_error"] = None
+            backoff = 0.0
+            while not _listener_stop.is_set():
+                if not _select.select([pg], [], [], 1.0)[0]:
+                    continue
+                pg.poll()
+                while pg.notifies:
+                    _handle(pg.notifies.pop(0).payload)
+        except Exception as e:
+            _listener_stats["last_error"] = str(e)
+            print(f"[cache] Invalidation listener failed: {e}")
+        finally:
+            _listener_stats["connected"] = False
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+        _listener_stats["reconnects"] += 1
+        backoff = min(_MAX_RECONNECT_BACKOFF_S, max(1.0, backoff * 2))
+        _listener_stop.wait(backoff)
+
+
+def start_listener() -> None:
+    """Listen for invalidations from other workers (PostgreSQL with psycopg2 only)."""
+    global _listener
+    if not _cache.enabled or (_listener is not None and _listener.is_alive()):
+        return
+    if engine.dialect.name != "postgresql" or engine.dialect.driver != "psycopg2":
+        return
+    _listener_stop.clear()
+    _listener = threading.Thread(target=_listen, name="ifrpm-cache-listener", daemon=True)
+    _listener.start()
+
+
+def stop_listener() -> None:
+    """Stop the invalidation listener."""
+    _listener_stop.set()
+
+
+def response_cache_stats() -> dict:
+    """Return response cache hit rate, 304s, recompute timings and listener state."""
+    return {
+        **_cache.stats(),
+        "listener": {
+            "running": _listener is not None and _listener.is_alive(),
+            "channel": CHANNEL,
+            **_listener_stats,
+        },
+    }
@@ -0,0 +1,400 @@
+"""RUL prediction storage lifecycle — partitions, rollups and retention.
+
+- On PostgreSQL a fresh `rul_predictions` is created range-partitioned by
+  month on `predicted_at`; partitions are created `rul_partition_months_ahead`
+  months in advance, and a default partition catches anything outside them.
+- Raw predictions are downsampled into `rul_rollups`: hourly buckets from raw
+  rows, daily buckets from hourly ones, each holding min / mean / last RUL
+  per component.
+- Raw rows older than `rul_raw_retention_days` and hourly rollups older than
+  `rul_hourly_retention_days` are removed once rolled up; whole expired
+  partitions are dropped instead of deleted row by row.
+
+A background thread runs `run_retention` every `retention_interval_s`. Each
+run re-aggregates from the newest existing bucket onward, so a bucket still
+being filled is refreshed on the next run. Rows written with a `predicted_at`
+older than that bucket are not folded in. History reads aggregate the raw
+rows from that bucket onward at query time (`raw_buckets`), so rolled-up
+history reaches the latest prediction between runs.
+"""
+
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Select, case, delete, func, insert, inspect, literal, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import Base, SessionLocal, engine
+from app.models.rul_prediction import RULPrediction
+from app.models.rul_rollup import RULRollup
+
+_TABLE = RULPrediction.__tablename__
+
+_PARTITIONED_DDL = f"""
+CREATE TABLE {_TABLE} (
+    id            SERIAL,
+    component_id  INTEGER NOT NULL REFERENCES components (id),
+    cycle         INTEGER NOT NULL,
+    predicted_rul DOUBLE PRECISION NOT NULL,
+    confidence    DOUBLE PRECISION,
+    model_version VARCHAR,
+    predicted_at  TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, predicted_at)
+) PARTITION BY RANGE (predicted_at)
+"""
+
+_lock = threading.Lock()
+_stats = {
+    "runs": 0,
+    "failures": 0,
+    "last_run_at": None,
+    "last_duration_ms": None,
+    "last_rolled_up": None,
+    "last_pruned": None,
+    "last_error": None,
+}
+
+_scheduler: threading.Thread | None = None
+_scheduler_stop = threading.Event()
+
+
+# ---------------------------------------------------------------------------
+# Partitions (PostgreSQL)
+# ---------------------------------------------------------------------------
+
+def _month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def _next_month(d: date) -> date:
+    return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"{_TABLE}_{month:%Y_%m}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    """True when rul_predictions is a PostgreSQL partitioned table."""
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t))"
+    ), {"t": _TABLE}).scalar())
+
+
+def prepare_partitions() -> None:
+    """Create rul_predictions partitioned by month if it does not exist yet (PostgreSQL only).
+
+    An existing unpartitioned table is left alone; converting it is a manual
+    migration.
+    """
+    if engine.dialect.name != "postgresql" or not settings.rul_partitioning:
+        return
+    with engine.begin() as conn:
+        if not inspect(conn).has_table(_TABLE):
+            # The partitioned DDL references components, so create its parents first.
+            parents = [t for t in Base.metadata.sorted_tables if t.name in ("aircraft", "components")]
+            Base.metadata.create_all(conn, tables=parents)
+            conn.execute(text(_PARTITIONED_DDL))
+            print(f"[storage] Created {_TABLE} partitioned by month")
+        if is_partitioned(conn):
+            ensure_partitions(conn)
+
+
+def ensure_partitions(conn: Connection, today: date | None = None) -> list[str]:
+    """Create the previous, current and upcoming monthly partitions plus the default one."""
+    month = _month_start(today or datetime.utcnow().date())
+    month = _month_start(month - timedelta(days=1))
+    created = []
+    for _ in range(settings.rul_partition_months_ahead + 2):
+        upper = _next_month(month)
+        name = _partition_name(month)
+        if not inspect(conn).has_table(name):
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {_TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+            ))
+            created.append(name)
+        month = upper
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {_TABLE}_default PARTITION OF {_TABLE} DEFAULT"))
+    return created
+
+
+def _drop_expired_partitions(conn: Connection, cutoff: datetime) -> int:
+    """Drop monthly partitions that lie entirely before cutoff; return rows removed."""
+    names = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:t)"
+    ), {"t": _TABLE}).scalars().all()
+    removed = 0
+    for name in names:
+        try:
+            month = datetime.strptime(name[len(_TABLE) + 1:], "%Y_%m")
+        except ValueError:
+            continue  # the default partition
+        if datetime.combine(_next_month(month.date()), datetime.min.time()) <= cutoff:
+            removed += conn.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+            conn.execute(text(f"ALTER TABLE {_TABLE} DETACH PARTITION {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+    return removed
+
+
+# ---------------------------------------------------------------------------
+# Rollups
+# ---------------------------------------------------------------------------
+
+def bucket(column, resolution: str, dialect: str):
+    """SQL expression truncating a timestamp column to the start of its hour or day."""
+    if dialect == "postgresql":
+        return func.date_trunc(resolution, column)
+    # SQLite stores DateTime as text; match SQLAlchemy's format so comparisons stay lexical.
+    fmt = "%Y-%m-%d %H:00:00.000000" if resolution == "hour" else "%Y-%m-%d 00:00:00.000000"
+    return func.strftime(fmt, column)
+
+
+def _watermark(db: Session, resolution: str) -> datetime | None:
+    """Start of the newest existing bucket at this resolution (re-aggregated on the next run)."""
+    return db.scalar(select(func.max(RULRollup.bucket_start)).where(RULRollup.resolution == resolution))
+
+
+def raw_buckets(resolution: str, dialect: str, *criteria) -> Select:
+    """Aggregate raw predictions matching `criteria` into hour or day buckets.
+
+    Selects the rul_rollups columns in table order, so the result can be
+    inserted as rollups or read alongside them.
+    """
+    ts = bucket(RULPrediction.predicted_at, resolution, dialect)
+    ranked = select(
+        RULPrediction.component_id,
+        ts.label("bucket_start"),
+        RULPrediction.predicted_rul.label("rul"),
+        RULPrediction.cycle,
+        func.row_number().over(
+            partition_by=(RULPrediction.component_id, ts),
+            order_by=(RULPrediction.predicted_at.desc(), RULPrediction.id.desc()),
+        ).label("recency"),
+    ).where(*criteria).subquery()
+    latest = ranked.c.recency == 1
+    return select(
+        ranked.c.component_id,
+        literal(resolution).label("resolution"),
+        ranked.c.bucket_start,
+        func.min(ranked.c.rul).label("min_rul"),
+        func.avg(ranked.c.rul).label("mean_rul"),
+        func.max(case((latest, ranked.c.rul))).label("last_rul"),
+        func.max(case((latest, ranked.c.cycle))).label("last_cycle"),
+        func.count().label("samples"),
+    ).group_by(ranked.c.component_id, ranked.c.bucket_start)
+
+
+def rollup_watermark(resolution: str):
+    """Scalar subquery for the newest stored bucket at this resolution (NULL before the first run).
+
+    Buckets before it are complete; it and anything later exist only as raw rows.
+    """
+    return (
+        select(func.max(RULRollup.bucket_start))
+        .where(RULRollup.resolution == resolution)
+        .scalar_subquery()
+    )
+
+
+def _rollup_hourly(db: Session) -> int:
+    """Aggregate raw predictions into hourly buckets from the hourly watermark onward."""
+    since = _watermark(db, "hour")
+    criteria = [] if since is None else [RULPrediction.predicted_at >= since]
+    return _replace_buckets(db, "hour", since, raw_buckets("hour", db.bind.dialect.name, *criteria))
+
+
+def _rollup_daily(db: Session) -> int:
+    """Aggregate hourly buckets into daily ones from the daily watermark onward."""
+    since = _watermark(db, "day")
+    day = bucket(RULRollup.bucket_start, "day", db.bind.dialect.name)
+    ranked = select(
+        RULRollup.component_id,
+        day.label("bucket_start"),
+        RULRollup.min_rul,
+        RULRollup.mean_rul,
+        RULRollup.last_rul,
+        RULRollup.last_cycle,
+        RULRollup.samples,
+        func.row_number().over(
+            partition_by=(RULRollup.component_id, day),
+            order_by=RULRollup.bucket_start.desc(),
+        ).label("recency"),
+    ).where(RULRollup.resolution == "hour")
+    if since is not None:
+        ranked = ranked.where(RULRollup.bucket_start >= since)
+    ranked = ranked.subquery()
+    latest = ranked.c.recency == 1
+    return _replace_buckets(db, "day", since, select(
+        ranked.c.component_id,
+        literal("day"),
+        ranked.c.bucket_start,
+        func.min(ranked.c.min_rul),
+        func.sum(ranked.c.mean_rul * ranked.c.samples) / func.sum(ranked.c.samples),
+        func.max(case((latest, ranked.c.last_rul))),
+        func.max(case((latest, ranked.c.last_cycle))),
+        func.sum(ranked.c.samples),
+    ).group_by(ranked.c.component_id, ranked.c.bucket_start))
+
+
+def _replace_buckets(db: Session, resolution: str, since: datetime | None, aggregate) -> int:
+    """Delete buckets from `since` on and insert the freshly aggregated ones."""
+    stale = delete(RULRollup).where(RULRollup.resolution == resolution)
+    if since is not None:
+        stale = stale.where(RULRollup.bucket_start >= since)
+    db.execute(stale)
+    columns = ["component_id", "resolution", "bucket_start", "min_rul", "mean_rul",
+               "last_rul", "last_cycle", "samples"]
+    return db.execute(insert(RULRollup).from_select(columns, aggregate)).rowcount
+
+
+# ---------------------------------------------------------------------------
+# Retention
+# ---------------------------------------------------------------------------
+
+def floor_bucket(ts: datetime, resolution: str) -> datetime:
+    """Start of the hour or day bucket containing ts."""
+    ts = ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if resolution == "day" else ts
+
+
+def _prune_raw(db: Session, now: datetime) -> int:
+    """Remove raw predictions past retention that are already covered by hourly rollups."""
+    if settings.rul_raw_retention_days <= 0:
+        return 0
+    cutoff = floor_bucket(now - timedelta(days=settings.rul_raw_retention_days), "hour")
+    watermark = _watermark(db, "hour")
+    if watermark is None:
+        return 0
+    cutoff = min(cutoff, watermark)
+    removed = 0
+    conn = db.connection()
+    if is_partitioned(conn):
+        removed += _drop_expired_partitions(conn, cutoff)
+    removed += db.execute(delete(RULPrediction).where(RULPrediction.predicted_at < cutoff)).rowcount
+    return removed
+
+
+def _prune_hourly(db: Session, now: datetime) -> int:
+    """Remove hourly rollups past retention that are already covered by daily rollups."""
+    if settings.rul_hourly_retention_days <= 0:
+        return 0
+    cutoff = floor_bucket(now - timedelta(days=settings.rul_hourly_retention_days), "day")
+    watermark = _watermark(db, "day")
+    if watermark is None:
+        return 0
+    return db.execute(delete(RULRollup).where(
+        RULRollup.resolution == "hour", RULRollup.bucket_start < min(cutoff, watermark),
+    )).rowcount
+
+
+def raw_cutoff(now: datetime | None = None) -> datetime | None:
+    """Oldest predicted_at still guaranteed to be stored raw (None = raw kept forever)."""
+    if settings.rul_raw_retention_days <= 0:
+        return None
+    return (now or datetime.utcnow()) - timedelta(days=settings.rul_raw_retention_days)
+
+
+def hourly_cutoff(now: datetime | None = None) -> datetime | None:
+    """Oldest bucket still guaranteed to be kept at hourly resolution (None = forever)."""
+    if settings.rul_hourly_retention_days <= 0:
+        return None
+    return (now or datetime.utcnow()) - timedelta(days=settings.rul_hourly_retention_days)
+
+
+def history_resolution(start: datetime | None, end: datetime | None, now: datetime | None = None) -> str:
+    """Pick the finest resolution that serves a history range: raw, hour or day.
+
+    Ranges longer than `history_raw_max_days` / `history_hourly_max_days`, or
+    reaching back past what is still kept at a resolution, use the next
+    coarser one. An open start reads raw rows.
+    """
+    if start is None:
+        return "raw"
+    now = now or datetime.utcnow()
+    span = (end or now) - start
+    kept_hourly, kept_raw = hourly_cutoff(now), raw_cutoff(now)
+    if span > timedelta(days=settings.history_hourly_max_days) or (kept_hourly and start < kept_hourly):
+        return "day"
+    if span > timedelta(days=settings.history_raw_max_days) or (kept_raw and start < kept_raw):
+        return "hour"
+    return "raw"
+
+
+def run_retention(now: datetime | None = None) -> dict:
+    """Create upcoming partitions, refresh rollups, prune expired rows; return the run's counts."""
+    now = now or datetime.utcnow()
+    started = time.perf_counter()
+    try:
+        with SessionLocal() as db:
+            conn = db.connection()
+            if is_partitioned(conn):
+                ensure_partitions(conn, now.date())
+            hourly = _rollup_hourly(db)
+            daily = _rollup_daily(db)
+            raw_pruned = _prune_raw(db, now)
+            hourly_pruned = _prune_hourly(db, now)
+            db.commit()
+    except Exception as e:
+        with _lock:
+            _stats["failures"] += 1
+            _stats["last_error"] = str(e)
+        raise
+
+    run = {
+        "duration_ms": round((time.perf_counter() - started) * 1000.0, 1),
+        "rolled_up": {"hour": hourly, "day": daily},
+        "pruned": {"raw": raw_pruned, "hour": hourly_pruned},
+    }
+    with _lock:
+        _stats["runs"] += 1
+        _stats["last_run_at"] = time.time()
+        _stats["last_duration_ms"] = run["duration_ms"]
+        _stats["last_rolled_up"] = run["rolled_up"]
+        _stats["last_pruned"] = run["pruned"]
+        _stats["last_error"] = None
+    return run
+
+
+def start_scheduler() -> None:
+    """Run `run_retention` every `retention_interval_s` on a background thread."""
+    global _scheduler
+    if settings.retention_interval_s <= 0 or (_scheduler is not None and _scheduler.is_alive()):
+        return
+    _scheduler_stop.clear()
+
+    def _loop() -> None:
+        while not _scheduler_stop.wait(settings.retention_interval_s):
+            try:
+                run_retention()
+            except Exception as e:
+                print(f"[storage] Retention run failed: {e}")
+
+    _scheduler = threading.Thread(target=_loop, name="ifrpm-retention", daemon=True)
+    _scheduler.start()
+
+
+def stop_scheduler() -> None:
+    """Stop the retention scheduler."""
+    _scheduler_stop.set()
+
+
+def retention_stats() -> dict:
+    """Return policy, partitioning state and the last run's rollup / prune counts."""
+    with engine.connect() as conn:
+        partitioned = is_partitioned(conn)
+    with _lock:
+        return {
+            "running": _scheduler is not None and _scheduler.is_alive(),
+            "interval_s": settings.retention_interval_s,
+            "partitioned": partitioned,
+            "raw_retention_days": settings.rul_raw_retention_days,
+            "hourly_retention_days": settings.rul_hourly_retention_days,
+            **_stats,
+        }
@@ -1,6 +1,12 @@
 """Risk band classification."""
 
+import numpy as np
+
 from app.config import settings
+from app.utils.risk_bands import RISK_BANDS
+
+# RUL (cycles) that maps to a health index of 1.0.
+HEALTH_RUL_SCALE = 120.0
 
 
 def classify_risk_band(rul: float) -> str:
@@ -14,6 +20,28 @@ def classify_risk_band(rul: float) -> str:
     return "LOW"
 
 
+def classify_risk_bands(ruls: np.ndarray) -> np.ndarray:
+    """Vectorized `classify_risk_band` over an array of RUL values."""
+    ruls = np.asarray(ruls, dtype=float)
+    return np.select(
+        [ruls < settings.rul_critical_threshold,
+         ruls < settings.rul_high_threshold,
+         ruls < settings.rul_medium_threshold],
+        RISK_BANDS[:3],
+        default=RISK_BANDS[3],
+    )
+
+
+def rul_health_index(ruls: np.ndarray) -> np.ndarray:
+    """Map RUL values to a 0–1 health index (RUL / HEALTH_RUL_SCALE, capped at 1)."""
+    return np.round(np.clip(np.asarray(ruls, dtype=float) / HEALTH_RUL_SCALE, 0.0, 1.0), 4)
+
+
 def should_alert(rul: float) -> bool:
     """Return True when RUL is within the actionable threshold."""
     return rul < settings.rul_medium_threshold
+
+
+def alert_condition(column):
+    """SQL counterpart of `should_alert` for a column."""
+    return column < settings.rul_medium_threshold
@@ -1,26 +1,41 @@
 """RUL prediction and persistence service."""
 
-import pandas as pd
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy import Select, or_, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.orm import Session
 
-from app.ml.inference import predict_rul
+from app.ml.inference import predict_rul, predict_rul_batch
+from app.ml.wire import WindowPayload
+from app.models.component import Component
 from app.models.rul_prediction import RULPrediction
-from app.schemas.rul import RULResponse, SensorWindow
+from app.models.rul_rollup import RULRollup
+from app.schemas.rul import RULResponse
+from app.services.prediction_writer import persist_predictions
+from app.services.retention_service import floor_bucket, raw_buckets, rollup_watermark
 from app.services.risk_service import classify_risk_band
 
 
-def run_rul_inference(payload: SensorWindow, db: Session) -> RULResponse:
-    """Run RUL inference, persist the result, and return the response."""
-    sensor_df = pd.DataFrame(payload.sensors)
-    rul = predict_rul(sensor_df)
+def run_rul_inference(payload: WindowPayload, db: Session) -> RULResponse:
+    """Run RUL inference, persist the result, and return the response.
+
+    @raises WriterBackpressure when write-behind persistence is full.
+    """
+    pred = predict_rul(payload.window)
+    rul = pred.rul
     band = classify_risk_band(rul)
 
-    db.add(RULPrediction(
-        component_id=int(payload.unit_id),
-        cycle=payload.cycle,
-        predicted_rul=rul,
-    ))
-    db.commit()
+    persist_predictions([{
+        "component_id": int(payload.unit_id),
+        "cycle": payload.cycle,
+        "predicted_rul": rul,
+        "model_version": pred.model_version,
+    }], db)
 
     return RULResponse(
         unit_id=payload.unit_id,
@@ -28,9 +43,45 @@ def run_rul_inference(payload: SensorWindow, db: Session) -> RULResponse:
         predicted_rul=rul,
         risk_band=band,
         confidence=1.0,
+        members=pred.members,
+        model_version=pred.model_version,
     )
 
 
+def run_rul_batch_inference(payloads: list[WindowPayload], db: Session) -> list[RULResponse]:
+    """Score many windows in one ensemble pass and bulk-insert the results.
+
+    @raises WriterBackpressure when write-behind persistence is full.
+    """
+    if not payloads:
+        return []
+
+    preds = predict_rul_batch([p.window for p in payloads])
+
+    persist_predictions([
+        {
+            "component_id": int(p.unit_id),
+            "cycle": p.cycle,
+            "predicted_rul": pred.rul,
+            "model_version": pred.model_version,
+        }
+        for p, pred in zip(payloads, preds)
+    ], db)
+
+    return [
+        RULResponse(
+            unit_id=p.unit_id,
+            cycle=p.cycle,
+            predicted_rul=pred.rul,
+            risk_band=classify_risk_band(pred.rul),
+            confidence=1.0,
+            members=pred.members,
+            model_version=pred.model_version,
+        )
+        for p, pred in zip(payloads, preds)
+    ]
+
+
 def get_component_history(component_id: int, db: Session) -> list[RULPrediction]:
     """Return RUL records for a component ordered by cycle."""
     return (
@@ -39,3 +90,117 @@ def get_component_history(component_id: int, db: Session) -> list[RULPrediction]
         .order_by(RULPrediction.cycle)
         .all()
     )
+
+
+HISTORY_COLUMNS = ("id", "component_id", "cycle", "predicted_rul", "confidence", "model_version", "predicted_at")
+ROLLUP_COLUMNS = ("component_id", "resolution", "bucket_start", "min_rul", "mean_rul",
+                  "last_rul", "last_cycle", "samples")
+
+# Keyset (time, tie-breaker) columns per history resolution.
+HISTORY_KEYS = {
+    "raw": ("predicted_at", "id"),
+    "hour": ("bucket_start", "component_id"),
+    "day": ("bucket_start", "component_id"),
+}
+
+# Rows fetched per round trip when streaming history from a server-side cursor.
+_HISTORY_YIELD_PER = 1000
+
+
+def history_statement(aircraft_id: int, component_id: int | None = None,
+                      start: datetime | None = None, end: datetime | None = None,
+                      after: tuple[datetime, int] | None = None, resolution: str = "raw",
+                      dialect: str = "postgresql") -> Select:
+    """Build the time-ordered history query for an aircraft.
+
+    `raw` reads rul_predictions ordered by (predicted_at, id); `hour` / `day`
+    read rollups ordered by (bucket_start, component_id), starting with the
+    bucket that contains `start`. Stored rollups stop at the last retention
+    run; buckets from its watermark on are aggregated from raw rows instead.
+    @param component_id - Only this component.
+    @param start        - Only predictions at or after this time.
+    @param end          - Only predictions before this time.
+    @param after        - Keyset position (see HISTORY_KEYS) of the last row already returned.
+    @param resolution   - raw, hour or day.
+    @param dialect      - Database dialect name, for bucketing raw rows.
+    """
+    components = select(Component.id).where(Component.aircraft_id == aircraft_id)
+    if component_id is not None:
+        components = components.where(Component.id == component_id)
+
+    if resolution == "raw":
+        table, columns = RULPrediction.__table__, HISTORY_COLUMNS
+    else:
+        if start is not None:
+            start = floor_bucket(start, resolution)
+        table, columns = _rollup_source(components, start, resolution, dialect), ROLLUP_COLUMNS
+    time_col, tie_col = (table.c[k] for k in HISTORY_KEYS[resolution])
+
+    stmt = select(*(table.c[c] for c in columns)).order_by(time_col, tie_col)
+    if resolution == "raw":
+        stmt = stmt.where(table.c.component_id.in_(components))
+    if start is not None:
+        stmt = stmt.where(time_col >= start)
+    if end is not None:
+        stmt = stmt.where(time_col < end)
+    if after is not None:
+        stmt = stmt.where(tuple_(time_col, tie_col) > tuple_(*after))
+    return stmt
+
+
+def _rollup_source(components: Select, start: datetime | None, resolution: str, dialect: str):
+    """Stored buckets before the rollup watermark plus raw rows from it on, bucketed at query time."""
+    watermark = rollup_watermark(resolution)
+    stored = select(*(getattr(RULRollup, c) for c in ROLLUP_COLUMNS)).where(
+        RULRollup.resolution == resolution,
+        RULRollup.bucket_start < watermark,
+        RULRollup.component_id.in_(components),
+    )
+    criteria = [
+        or_(watermark.is_(None), RULPrediction.predicted_at >= watermark),
+        RULPrediction.component_id.in_(components),
+    ]
+    if start is not None:
+        criteria.append(RULPrediction.predicted_at >= start)
+    return union_all(stored, raw_buckets(resolution, dialect, *criteria)).subquery("rollups")
+
+
+async def history_page(stmt: Select, limit: int, resolution: str,
+                       db: AsyncSession) -> tuple[list[dict], tuple[datetime, int] | None]:
+    """Return up to limit rows and the keyset position to continue from (None on the last page)."""
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    after = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]._mapping
+        after = tuple(last[k] for k in HISTORY_KEYS[resolution])
+    return [row._asdict() for row in rows], after
+
+
+async def stream_history(stmt: Select, fmt: str, bind: AsyncEngine) -> AsyncIterator[str]:
+    """Yield history rows as NDJSON lines or CSV (with header), read from a server-side cursor.
+
+    Opens its own session on `bind` (the request session's engine, so the
+    replica-or-primary choice carries over): the response body is produced
+    after the request's session has been closed.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def _drain() -> str:
+        chunk = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return chunk
+
+    if fmt == "csv":
+        writer.writerow(stmt.selected_columns.keys())
+        yield _drain()
+    async with AsyncSession(bind) as db:
+        result = await db.stream(stmt.execution_options(yield_per=_HISTORY_YIELD_PER))
+        async for rows in result.partitions():
+            if fmt == "csv":
+                writer.writerows(rows)
+                yield _drain()
+            else:
+                yield "".join(json.dumps(row._asdict(), default=datetime.isoformat) + "\n" for row in rows)
@@ -0,0 +1,217 @@
+"""Streaming RUL ingestion — per-component ring buffers for /rul/stream.
+
+Clients push individual readings (or short runs of them) per component
+instead of re-sending whole overlapping windows. Each component keeps the
+last `stream_window_size` readings in a fixed numpy ring buffer; a
+prediction is scored over the buffered window every `stream_stride` new
+readings, or as soon as a watched sensor crosses its threshold upward.
+Nothing is scored before the buffer holds a full window: models fed by a
+feature pipeline reject shorter windows. A crossing seen while the buffer
+is still filling fires once it is full.
+
+Every reading also updates a process-wide `OnlineFeatureEngine` keyed by
+unit_id, whose current rolling features ride along with each pushed
+prediction. Its state is restored at startup and checkpointed at shutdown
+(`stream_features_checkpoint`), so it survives restarts and reconnects.
+"""
+
+import json
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from app.config import settings
+from app.database import SessionLocal
+from app.ml import wire
+from app.ml.features import RawWindow
+from app.schemas.rul import RULResponse, StreamConfig, StreamSample
+from app.services.rul_service import run_rul_inference
+from app.utils.online_features import OnlineFeatureEngine
+
+online_features = OnlineFeatureEngine(settings.stream_feature_window, settings.stream_slope_window)
+
+
+class RingBuffer:
+    """Fixed-capacity (capacity, n_columns) float buffer; oldest rows are overwritten."""
+
+    def __init__(self, columns: tuple[str, ...], capacity: int):
+        self.columns = columns
+        self.capacity = capacity
+        self._data = np.empty((capacity, len(columns)))
+        self._next = 0
+        self.size = 0
+
+    def extend(self, rows: np.ndarray) -> None:
+        n = rows.shape[0]
+        if n >= self.capacity:
+            self._data[:] = rows[-self.capacity:]
+            self._next, self.size = 0, self.capacity
+            return
+        end = self._next + n
+        if end <= self.capacity:
+            self._data[self._next:end] = rows
+        else:
+            split = self.capacity - self._next
+            self._data[self._next:] = rows[:split]
+            self._data[:n - split] = rows[split:]
+        self._next = end % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def last(self) -> np.ndarray | None:
+        """Return the most recent row, or None when empty."""
+        return self._data[self._next - 1] if self.size else None
+
+    def window(self) -> np.ndarray:
+        """Return the buffered rows oldest-first as a new array."""
+        if self.size < self.capacity:
+            return self._data[:self.size].copy()
+        return np.concatenate([self._data[self._next:], self._data[:self._next]])
+
+
+@dataclass
+class ComponentStream:
+    buffer: RingBuffer
+    cycle: int = 0
+    since_scored: int = 0
+    threshold_pending: bool = False
+
+
+@dataclass
+class StreamSession:
+    """Per-connection stream state: one ring buffer per unit_id plus trigger rules."""
+
+    window_size: int = field(default_factory=lambda: settings.stream_window_size)
+    stride: int = field(default_factory=lambda: settings.stream_stride)
+    thresholds: dict[str, float] = field(default_factory=lambda: dict(settings.stream_thresholds))
+    components: dict[str, ComponentStream] = field(default_factory=dict)
+
+    def configure(self, config: StreamConfig) -> None:
+        if config.stride is not None:
+            self.stride = config.stride
+        if config.thresholds is not None:
+            self.thresholds = config.thresholds
+
+    def ingest(self, unit_id: str, cycle: int, columns: tuple[str, ...],
+               rows: np.ndarray) -> tuple[wire.WindowPayload, str] | None:
+        """Append readings for a component; return (window, trigger) when a prediction is due.
+
+        A change in the component's sensor columns restarts its buffer.
+        """
+        stream = self.components.get(unit_id)
+        if stream is None or stream.buffer.columns != columns:
+            stream = ComponentStream(RingBuffer(columns, self.window_size))
+            self.components[unit_id] = stream
+
+        if self._crossed(stream.buffer, rows):
+            stream.threshold_pending = True
+        stream.buffer.extend(rows)
+        for row in rows:
+            online_features.update(unit_id, dict(zip(columns, row.tolist())))
+        stream.cycle = cycle
+        stream.since_scored += rows.shape[0]
+
+        if stream.buffer.size < self.window_size:
+            return None
+        if stream.threshold_pending:
+            trigger = "threshold"
+        elif stream.since_scored >= self.stride:
+            trigger = "stride"
+        else:
+            return None
+        stream.since_scored = 0
+        stream.threshold_pending = False
+        window = RawWindow(columns, stream.buffer.window())
+        return wire.WindowPayload(unit_id, cycle, window), trigger
+
+    def _crossed(self, buffer: RingBuffer, rows: np.ndarray) -> bool:
+        """True if any watched sensor goes from <= threshold to > threshold in rows."""
+        prev = buffer.last()
+        for name, level in self.thresholds.items():
+            if name not in buffer.columns:
+                continue
+            col = rows[:, buffer.columns.index(name)]
+            if prev is not None:
+                col = np.concatenate([[prev[buffer.columns.index(name)]], col])
+            elif col[0] > level:
+                return True
+            if np.any((col[:-1] <= level) & (col[1:] > level)):
+                return True
+        return False
+
+
+def parse_message(session: StreamSession, message: str | bytes) -> list[tuple[wire.WindowPayload, str]]:
+    """Apply one client message to the session; return the predictions it triggers.
+
+    Text messages are a `StreamSample` or `{"type": "config", ...}` (`StreamConfig`);
+    binary messages are raw frames as accepted by /rul/predict. Nothing is
+    ingested unless every sample in the message carries at least one reading.
+    @raises pydantic.ValidationError, wire.PayloadError or ValueError for malformed messages.
+    """
+    if isinstance(message, bytes):
+        samples = [(p.unit_id, p.cycle, p.window.columns, p.window.values)
+                   for p in wire.decode_frames(message)]
+    else:
+        data = json.loads(message)
+        if isinstance(data, dict) and data.get("type") == "config":
+            session.configure(StreamConfig.model_validate(data))
+            return []
+        sample = StreamSample.model_validate(data)
+        if not sample.sensors:
+            raise ValueError(f"Sample for unit {sample.unit_id} has no sensors.")
+        columns = tuple(sample.sensors)
+        rows = np.column_stack([np.atleast_1d(np.asarray(v, dtype=float)) for v in sample.sensors.values()])
+        samples = [(sample.unit_id, sample.cycle, columns, rows)]
+
+    for unit_id, _, _, rows in samples:
+        if rows.shape[0] == 0:
+            raise ValueError(f"Sample for unit {unit_id} has no readings.")
+
+    due = []
+    for unit_id, cycle, columns, rows in samples:
+        hit = session.ingest(unit_id, cycle, columns, rows)
+        if hit is not None:
+            due.append(hit)
+    return due
+
+
+def score_and_persist(payload: wire.WindowPayload) -> RULResponse:
+    """Score a streamed window and store it as a RULPrediction (runs in a worker thread)."""
+    with SessionLocal() as db:
+        return run_rul_inference(payload, db)
+
+
+def unit_features(unit_id: str) -> dict[str, float | None]:
+    """Return the unit's current online rolling features; NaN (still warming up) becomes None."""
+    return {k: None if math.isnan(v) else v for k, v in online_features.features(unit_id).items()}
+
+
+def restore_features() -> None:
+    """Load the online feature checkpoint, if any; one written with other windows is ignored."""
+    global online_features
+    path = settings.stream_features_checkpoint
+    if not path:
+        return
+    window, slope_window = settings.stream_feature_window, settings.stream_slope_window
+    try:
+        engine = OnlineFeatureEngine.restore(path, window, slope_window)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"[stream] Could not restore online features from {path}: {e}")
+        return
+    if (engine.window, engine.slope_window) != (window, slope_window):
+        print(f"[stream] Ignoring {path}: written for windows {engine.window}/{engine.slope_window}")
+        return
+    online_features = engine
+    if engine.units():
+        print(f"[stream] Restored online features for {len(engine.units())} units")
+
+
+def checkpoint_features() -> None:
+    """Write the online feature state to `stream_features_checkpoint`."""
+    path = settings.stream_features_checkpoint
+    if not path:
+        return
+    try:
+        online_features.checkpoint(path)
+    except OSError as e:
+        print(f"[stream] Could not checkpoint online features to {path}: {e}")
@@ -0,0 +1,32 @@
+"""Startup phase timing.
+
+Each lifespan phase runs through `run_phase`, which executes blocking work
+off the event loop and records its wall time for the diagnostics endpoint.
+"""
+
+import asyncio
+import time
+from typing import Callable
+
+_phases: dict[str, float] = {}
+_total_ms: float | None = None
+
+
+async def run_phase(name: str, fn: Callable[[], None]) -> None:
+    """Run a blocking startup phase in a worker thread and record its duration."""
+    started = time.perf_counter()
+    await asyncio.to_thread(fn)
+    _phases[name] = round((time.perf_counter() - started) * 1000.0, 1)
+
+
+def finish(started: float) -> None:
+    """Record total startup time and print the per-phase breakdown."""
+    global _total_ms
+    _total_ms = round((time.perf_counter() - started) * 1000.0, 1)
+    breakdown = ", ".join(f"{name}={ms:.0f}ms" for name, ms in _phases.items())
+    print(f"[startup] ready in {_total_ms:.0f} ms ({breakdown})")
+
+
+def startup_report() -> dict:
+    """Return total startup time and per-phase durations in milliseconds."""
+    return {"total_ms": _total_ms, "phases": dict(_phases)}
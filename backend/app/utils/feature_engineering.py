@@ -20,20 +20,89 @@ def rolling_stats(df: pd.DataFrame, window: int = 5) -> pd.DataFrame:
 def trend_slope(series: pd.Series, window: int = 10) -> pd.Series:
     """Compute OLS slope over a rolling window for a sensor series.
 
+    Same values as `series.rolling(window, min_periods=2).apply(polyfit slope)`,
+    computed in one vectorized pass by `rolling_slope`.
+
     @param series - Single sensor time series.
     @param window - Rolling window size.
     """
-    def _slope(x: np.ndarray) -> float:
-        if len(x) < 2:
-            return 0.0
-        return float(np.polyfit(np.arange(len(x)), x, 1)[0])
+    return pd.Series(rolling_slope(series.to_numpy(dtype=float), window), index=series.index, name=series.name)
+
+
+def rolling_slope(values: np.ndarray, window: int = 10, min_periods: int = 2,
+                  groups: np.ndarray | None = None) -> np.ndarray:
+    """Rolling OLS slope down axis 0 for many series at once, via cumulative sums.
+
+    For row t the window is the last min(window, rows so far) readings, fitted
+    against x = 0..k-1 as `np.polyfit` does. Rows with fewer than `min_periods`
+    readings, or with a NaN inside their window, are NaN.
+
+    @param values      - (n_rows,) or (n_rows, n_series) array, e.g. all sensor columns.
+    @param window      - Rolling window size.
+    @param min_periods - Minimum readings in a window to produce a slope.
+    @param groups      - Optional per-row labels (e.g. unit id), contiguous per group;
+                         windows never reach back across a group boundary.
+    @returns           - Array shaped like values.
+    """
+    y = np.asarray(values, dtype=float)
+    squeeze = y.ndim == 1
+    if squeeze:
+        y = y[:, None]
+    n = y.shape[0]
+    t = np.arange(n)
+
+    start = np.maximum(t - window + 1, 0)
+    if groups is not None:
+        g = np.asarray(groups)
+        first = np.r_[True, g[1:] != g[:-1]] if n else np.zeros(0, dtype=bool)
+        start = np.maximum(start, np.maximum.accumulate(np.where(first, t, 0)))
+    k = (t - start + 1)[:, None].astype(float)
 
-    return series.rolling(window, min_periods=2).apply(_slope, raw=True)
+    nan = np.isnan(y)
+    # Slopes ignore a constant offset; centring keeps the sums small.
+    with np.errstate(invalid="ignore"):
+        offset = np.nanmean(y, axis=0) if n else np.zeros(y.shape[1])
+    yc = np.where(nan, 0.0, y - np.nan_to_num(offset))
+
+    # Prefix sums restart every `block` rows so rounding error scales with the
+    # window, not the series length; a window spans at most two blocks.
+    block = 2 * max(window, 1)
+    n_blocks = max(-(-n // block), 1)
+    padded = np.zeros((n_blocks * block, y.shape[1]))
+    padded[:n] = yc
+    padded = padded.reshape(n_blocks, block, -1)
+    local = np.arange(block)[None, :, None]
+    p_y = np.cumsum(padded, axis=1).reshape(-1, y.shape[1])[:n]
+    p_jy = np.cumsum(local * padded, axis=1).reshape(-1, y.shape[1])[:n]
+
+    block_t = (t // block) * block
+    spans = (start < block_t)[:, None]
+
+    def window_sum(prefix: np.ndarray) -> np.ndarray:
+        before_start = np.where((start % block == 0)[:, None], 0.0, prefix[np.maximum(start - 1, 0)])
+        prev_block_end = np.where(spans, prefix[np.maximum(block_t - 1, 0)], 0.0)
+        return prefix[t] + prev_block_end - before_start
+
+    sy = window_sum(p_y)
+    # Σ (j - start)·y_j = Σ (j - block_j)·y_j + (block_start - start)·Σ y_j + block·Σ_{j in 2nd block} y_j
+    sxy = window_sum(p_jy) + ((start // block) * block - start)[:, None] * sy + spans * block * p_y[t]
+    sx = k * (k - 1) / 2
+    sxx = (k - 1) * k * (2 * k - 1) / 6
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (k * sxy - sx * sy) / (k * sxx - sx * sx)
+
+    c_nan = np.vstack([np.zeros((1, y.shape[1])), np.cumsum(nan, axis=0)])
+    invalid = (k < max(min_periods, 2)) | (c_nan[t + 1] - c_nan[start] > 0)
+    slope = np.where(invalid, np.nan, slope)
+    return slope[:, 0] if squeeze else slope
 
 
 def normalize_operating_conditions(df: pd.DataFrame, condition_cols: list[str]) -> pd.DataFrame:
     """Z-score normalize operating condition columns in place.
 
+    Analysis helper only: model inputs are built by the fitted pipeline
+    shipped with each model (`app.ml.features`), not by this function.
+
     @param df             - Input DataFrame.
     @param condition_cols - Column names to normalize.
     """
@@ -1,4 +1,16 @@
-"""Composite Health Index via weighted sensor fusion."""
+"""Composite Health Index via weighted sensor fusion.
+
+`compute_health_index` scores one DataFrame. For the whole fleet, compile
+the per-`component_type` weights once into a `HealthIndexEngine` and score
+stacked (n_components, n_readings, n_sensors) windows in a single NumPy pass,
+optionally against a persisted `NormalizationReference` instead of each
+window's own min / max.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
 
 import numpy as np
 import pandas as pd
@@ -10,21 +22,100 @@ def compute_health_index(sensor_df: pd.DataFrame, weights: dict[str, float]) ->
     @param sensor_df - DataFrame of sensor readings; uses the last row.
     @param weights   - Sensor name → importance weight mapping.
     """
-    score = 0.0
-    total_weight = sum(weights.values())
+    sensors = [s for s in weights if s in sensor_df.columns]
+    window = sensor_df[sensors].to_numpy(dtype=float)[None]
+    vector = compile_weights(weights, sensors)
+    return float(score_windows(window, vector[None])[0])
+
+
+def compile_weights(weights: dict[str, float], sensors: Sequence[str]) -> np.ndarray:
+    """Return a weight vector aligned to `sensors`, divided by the total of all weights.
+
+    Weighted sensors missing from `sensors` still count toward the total, as
+    in `compute_health_index`.
+    """
+    total = sum(weights.values())
+    return np.array([weights.get(s, 0.0) / total if total else 0.0 for s in sensors])
+
+
+@dataclass
+class NormalizationReference:
+    """Fixed per-sensor [low, high] range used in place of each window's min / max."""
+
+    sensors: list[str]
+    low: np.ndarray
+    high: np.ndarray
+
+    @classmethod
+    def fit(cls, windows: np.ndarray, sensors: Sequence[str]) -> "NormalizationReference":
+        """Take each sensor's range over every reading in (n, T, S) windows (NaN ignored)."""
+        flat = windows.reshape(-1, windows.shape[-1])
+        return cls(list(sensors), np.nanmin(flat, axis=0), np.nanmax(flat, axis=0))
+
+    def save(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps({
+            "sensors": self.sensors, "low": self.low.tolist(), "high": self.high.tolist(),
+        }))
+
+    @classmethod
+    def load(cls, path: str | Path) -> "NormalizationReference":
+        data = json.loads(Path(path).read_text())
+        return cls(data["sensors"], np.asarray(data["low"], dtype=float), np.asarray(data["high"], dtype=float))
+
+    def aligned(self, sensors: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Return (low, high) reordered to `sensors`; unknown sensors get NaN."""
+        pos = {s: i for i, s in enumerate(self.sensors)}
+        idx = np.array([pos.get(s, -1) for s in sensors])
+        low = np.where(idx >= 0, self.low[idx], np.nan)
+        high = np.where(idx >= 0, self.high[idx], np.nan)
+        return low, high
+
+
+def score_windows(windows: np.ndarray, weights: np.ndarray,
+                  low: np.ndarray | None = None, high: np.ndarray | None = None) -> np.ndarray:
+    """Score many windows at once; each uses its last reading.
+
+    @param windows - (n, T, S) readings; NaN marks a sensor a component lacks.
+    @param weights - (n, S) compiled weight rows, one per window.
+    @param low     - Optional (S,) reference minimum; defaults to each window's own min.
+    @param high    - Optional (S,) reference maximum; defaults to each window's own max.
+    @returns       - (n,) scores in [0, 1], rounded to 4 places.
+    """
+    last = windows[:, -1, :]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if low is None or high is None:
+            low, high = np.fmin.reduce(windows, axis=1), np.fmax.reduce(windows, axis=1)
+        span = high - low
+        normalized = np.where(span == 0, 0.0, (last - low) / span)
+    score = np.nansum(normalized * weights, axis=1)
+    return np.round(np.clip(score, 0.0, 1.0), 4)
+
 
-    for sensor, weight in weights.items():
-        if sensor not in sensor_df.columns:
-            continue
-        val = sensor_df[sensor].iloc[-1]
-        normalized = _min_max_normalize(val, sensor_df[sensor].min(), sensor_df[sensor].max())
-        score += (normalized * weight) / total_weight
+class HealthIndexEngine:
+    """Fleet-wide health scoring with weight vectors precompiled per component_type.
+
+    @param sensors           - Sensor column order of the windows to be scored.
+    @param weights_by_type   - component_type → {sensor: weight}.
+    @param reference         - Optional persisted normalization range.
+    """
 
-    return round(float(np.clip(score, 0.0, 1.0)), 4)
+    def __init__(self, sensors: Sequence[str], weights_by_type: dict[str, dict[str, float]],
+                 reference: NormalizationReference | None = None):
+        self.sensors = list(sensors)
+        self.types = list(weights_by_type)
+        self._type_index = {t: i for i, t in enumerate(self.types)}
+        self._matrix = np.stack([compile_weights(w, self.sensors) for w in weights_by_type.values()]) \
+            if self.types else np.zeros((0, len(self.sensors)))
+        self._low, self._high = reference.aligned(self.sensors) if reference is not None else (None, None)
 
+    def score(self, windows: np.ndarray, component_types: Sequence[str]) -> np.ndarray:
+        """Return one health score per stacked window.
 
-def _min_max_normalize(value: float, min_val: float, max_val: float) -> float:
-    """Scale a value to [0, 1]."""
-    if max_val == min_val:
-        return 0.0
-    return (value - min_val) / (max_val - min_val)
+        @param windows         - (n_components, n_readings, n_sensors) in `sensors` order.
+        @param component_types - component_type per window; each must have compiled weights.
+        """
+        try:
+            rows = np.array([self._type_index[t] for t in component_types], dtype=int)
+        except KeyError as e:
+            raise ValueError(f"No health weights for component_type {e.args[0]!r}.") from None
+        return score_windows(windows, self._matrix[rows], self._low, self._high)
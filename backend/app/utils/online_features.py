@@ -0,0 +1,229 @@
+"""Incremental rolling features for online (per-sample) scoring.
+
+Streaming counterparts of `feature_engineering.rolling_stats` /
+`trend_slope` and phase_1's `add_rolling_features`: each new reading
+updates per-unit, per-sensor state in O(1) instead of recomputing the
+windows from scratch.
+
+- mean / std: sliding-window Welford updates (sample std, 0 for one reading)
+- min / max: monotonic deques
+- OLS slope: running sums of y and i·y over the window
+
+Values match the batch functions to floating-point tolerance, including their
+`min_periods` warm-up (mean/std/min/max from one reading, slope from two).
+State is checkpointed as the last readings of every series and rebuilt by
+replaying them: min / max and the windows themselves come back exactly;
+mean / std / slope match the live engine to rounding (~1e-12 relative), since
+the replayed running sums start from zero instead of carrying the live
+engine's accumulated rounding.
+"""
+
+import json
+import math
+import os
+from collections import deque
+
+# Running sums are rebuilt from the window this often to cap float drift.
+_RESYNC_EVERY = 4096
+
+
+class RollingWindow:
+    """Trailing-window mean, std, min and max of one series."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: deque[float] = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min: deque[tuple[int, float]] = deque()
+        self._max: deque[tuple[int, float]] = deque()
+        self._t = 0
+
+    def update(self, x: float) -> None:
+        if len(self.values) == self.window:
+            self._remove(self.values.popleft())
+        self.values.append(x)
+        n = len(self.values)
+        delta = x - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (x - self._mean)
+
+        while self._min and self._min[-1][1] >= x:
+            self._min.pop()
+        self._min.append((self._t, x))
+        while self._max and self._max[-1][1] <= x:
+            self._max.pop()
+        self._max.append((self._t, x))
+        oldest = self._t - self.window + 1
+        if self._min[0][0] < oldest:
+            self._min.popleft()
+        if self._max[0][0] < oldest:
+            self._max.popleft()
+
+        self._t += 1
+        if self._t % _RESYNC_EVERY == 0:
+            self._resync()
+
+    def _remove(self, y: float) -> None:
+        n = len(self.values)  # y already popped
+        if n == 0:
+            self._mean = self._m2 = 0.0
+            return
+        delta = y - self._mean
+        self._mean -= delta / n
+        self._m2 -= delta * (y - self._mean)
+
+    def _resync(self) -> None:
+        n = len(self.values)
+        self._mean = sum(self.values) / n
+        self._m2 = sum((v - self._mean) ** 2 for v in self.values)
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self.values else math.nan
+
+    @property
+    def std(self) -> float:
+        n = len(self.values)
+        if n < 2:
+            return 0.0 if n else math.nan
+        return math.sqrt(max(self._m2, 0.0) / (n - 1))
+
+    @property
+    def min(self) -> float:
+        return self._min[0][1] if self._min else math.nan
+
+    @property
+    def max(self) -> float:
+        return self._max[0][1] if self._max else math.nan
+
+
+class RollingSlope:
+    """Trailing-window OLS slope of a series against 0, 1, …, k−1."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: deque[float] = deque()
+        self._sy = 0.0
+        self._sxy = 0.0
+        self._t = 0
+
+    def update(self, y: float) -> None:
+        if len(self.values) == self.window:
+            # Drop y0 and shift every index down by one, then append at k-1.
+            y0 = self.values.popleft()
+            self._sxy -= self._sy - y0
+            self._sy -= y0
+        self._sxy += len(self.values) * y
+        self._sy += y
+        self.values.append(y)
+        self._t += 1
+        if self._t % _RESYNC_EVERY == 0:
+            self._sy = sum(self.values)
+            self._sxy = sum(i * v for i, v in enumerate(self.values))
+
+    @property
+    def slope(self) -> float:
+        k = len(self.values)
+        if k < 2:
+            return math.nan
+        sx = k * (k - 1) / 2
+        sxx = (k - 1) * k * (2 * k - 1) / 6
+        return (k * self._sxy - sx * self._sy) / (k * sxx - sx * sx)
+
+
+class _SensorState:
+    def __init__(self, window: int, slope_window: int):
+        self.stats = RollingWindow(window)
+        self.trend = RollingSlope(slope_window)
+
+    def update(self, x: float) -> None:
+        self.stats.update(x)
+        self.trend.update(x)
+
+    def history(self) -> list[float]:
+        longer = self.stats if self.stats.window >= self.trend.window else self.trend
+        return list(longer.values)
+
+
+class OnlineFeatureEngine:
+    """Per-unit online rolling features, checkpointable to JSON.
+
+    @param window       - Window for mean / std / min / max (`rolling_stats` window).
+    @param slope_window - Window for the OLS slope (`trend_slope` window).
+    """
+
+    def __init__(self, window: int = 5, slope_window: int = 10):
+        self.window = window
+        self.slope_window = slope_window
+        self._units: dict[str, dict[str, _SensorState]] = {}
+
+    def update(self, unit_id: str, sample: dict[str, float]) -> dict[str, float]:
+        """Fold one reading per sensor into the unit's state and return its current features.
+
+        Feature names follow `rolling_stats`: `<sensor>_mean_<w>`, `<sensor>_std_<w>`,
+        plus `<sensor>_min_<w>`, `<sensor>_max_<w>` and `<sensor>_slope_<slope_w>`.
+        """
+        sensors = self._units.setdefault(unit_id, {})
+        for name, value in sample.items():
+            state = sensors.get(name)
+            if state is None:
+                state = sensors[name] = _SensorState(self.window, self.slope_window)
+            state.update(float(value))
+        return self.features(unit_id)
+
+    def features(self, unit_id: str) -> dict[str, float]:
+        """Return the unit's current features without updating (empty if unseen)."""
+        out = {}
+        w, sw = self.window, self.slope_window
+        for name, state in self._units.get(unit_id, {}).items():
+            out[f"{name}_mean_{w}"] = state.stats.mean
+            out[f"{name}_std_{w}"] = state.stats.std
+            out[f"{name}_min_{w}"] = state.stats.min
+            out[f"{name}_max_{w}"] = state.stats.max
+            out[f"{name}_slope_{sw}"] = state.trend.slope
+        return out
+
+    def reset(self, unit_id: str) -> None:
+        self._units.pop(unit_id, None)
+
+    def units(self) -> list[str]:
+        return list(self._units)
+
+    def state_dict(self) -> dict:
+        """Return a JSON-serializable snapshot: config plus each series' recent readings."""
+        return {
+            "window": self.window,
+            "slope_window": self.slope_window,
+            "units": {
+                unit: {name: state.history() for name, state in sensors.items()}
+                for unit, sensors in self._units.items()
+            },
+        }
+
+    @classmethod
+    def from_state_dict(cls, state: dict) -> "OnlineFeatureEngine":
+        """Rebuild an engine by replaying the snapshot's readings."""
+        engine = cls(state["window"], state["slope_window"])
+        for unit, sensors in state["units"].items():
+            engine._units[unit] = {}
+            for name, history in sensors.items():
+                sensor = engine._units[unit][name] = _SensorState(engine.window, engine.slope_window)
+                for x in history:
+                    sensor.update(x)
+        return engine
+
+    def checkpoint(self, path: str) -> None:
+        """Write the snapshot to path atomically (temp file + rename)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state_dict(), f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def restore(cls, path: str, window: int = 5, slope_window: int = 10) -> "OnlineFeatureEngine":
+        """Load a checkpoint, or return a fresh engine if path does not exist."""
+        if not os.path.exists(path):
+            return cls(window, slope_window)
+        with open(path) as f:
+            return cls.from_state_dict(json.load(f))
@@ -0,0 +1,13 @@
+"""Risk band vocabulary and its SQL ordering, shared by models and services."""
+
+from sqlalchemy import case
+
+RISK_BANDS = ("CRITICAL", "HIGH", "MEDIUM", "LOW")
+
+# Rank given to a band outside RISK_BANDS; sorts after LOW.
+UNKNOWN_BAND_RANK = 99
+
+
+def risk_band_rank(column):
+    """SQL expression ranking a risk band column, 0 = CRITICAL (most urgent)."""
+    return case({band: rank for rank, band in enumerate(RISK_BANDS)}, value=column, else_=UNKNOWN_BAND_RANK)
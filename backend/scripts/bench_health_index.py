@@ -0,0 +1,58 @@
+"""Benchmark fleet health scoring: per-component compute_health_index vs HealthIndexEngine.
+
+Run from backend/:
+
+    python -m scripts.bench_health_index --components 5000 --readings 50
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.utils.health_index import HealthIndexEngine, NormalizationReference, compute_health_index
+
+COMPONENT_TYPES = ["engine", "compressor", "turbine", "fuel_system"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--components", type=int, default=5000)
+    parser.add_argument("--readings", type=int, default=50)
+    parser.add_argument("--sensors", type=int, default=14)
+    parser.add_argument("--loop-sample", type=int, default=500, help="Components timed with the per-row loop")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    sensors = [f"s{i}" for i in range(args.sensors)]
+    weights = {t: {s: float(rng.random()) for s in sensors} for t in COMPONENT_TYPES}
+    windows = rng.normal(size=(args.components, args.readings, args.sensors))
+    types = rng.choice(COMPONENT_TYPES, args.components)
+
+    sample = min(args.loop_sample, args.components)
+    started = time.perf_counter()
+    looped = [compute_health_index(pd.DataFrame(windows[i], columns=sensors), weights[types[i]])
+              for i in range(sample)]
+    loop_ms = (time.perf_counter() - started) * 1000.0 * args.components / sample
+
+    engine = HealthIndexEngine(sensors, weights)
+    started = time.perf_counter()
+    scores = engine.score(windows, types)
+    batch_ms = (time.perf_counter() - started) * 1000.0
+    assert np.array_equal(scores[:sample], looped)
+
+    reference = NormalizationReference.fit(windows, sensors)
+    ref_engine = HealthIndexEngine(sensors, weights, reference)
+    started = time.perf_counter()
+    ref_engine.score(windows, types)
+    ref_ms = (time.perf_counter() - started) * 1000.0
+
+    print(f"{args.components} components x {args.readings} readings x {args.sensors} sensors")
+    print(f"  per-component loop (extrapolated): {loop_ms:9.1f} ms")
+    print(f"  engine, per-window min/max:        {batch_ms:9.2f} ms  ({loop_ms / batch_ms:.0f}x)")
+    print(f"  engine, persisted reference:       {ref_ms:9.2f} ms  ({loop_ms / ref_ms:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""Run the app against a throwaway SQLite database with background jobs off."""
+
+import os
+import tempfile
+
+import pytest
+
+_tmp = tempfile.mkdtemp(prefix="ifrpm-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ["MODEL_DIR"] = f"{_tmp}/models"
+os.environ["RESCORE_INTERVAL_S"] = "0"
+os.environ["RETENTION_INTERVAL_S"] = "0"
+os.environ["MODEL_RELOAD_INTERVAL_S"] = "0"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as c:
+        yield c
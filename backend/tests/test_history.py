@@ -0,0 +1,48 @@
+"""Rolled-up /history must reach predictions newer than the last retention run."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.component import Component
+from app.models.rul_prediction import RULPrediction
+from app.models.rul_rollup import RULRollup
+from app.services.retention_service import floor_bucket, run_retention
+
+
+@pytest.fixture
+def no_rollups(client):
+    with SessionLocal() as db:
+        db.query(RULRollup).delete()
+        db.commit()
+
+
+def test_auto_day_history_before_any_rollup(client, no_rollups):
+    r = client.get("/api/v1/fleet/1/history", params={"start": "2020-01-01T00:00:00Z"})
+    assert r.status_code == 200
+    assert r.headers["X-History-Resolution"] == "day"
+    rows = r.json()
+    assert rows and sum(row["samples"] for row in rows) == 5 * 20
+
+
+def test_hour_history_extends_past_last_rollup(client, no_rollups):
+    run_retention()
+    predicted_at = datetime.utcnow() + timedelta(hours=3)
+    with SessionLocal() as db:
+        component = db.query(Component).filter(Component.aircraft_id == 1).first()
+        db.add(RULPrediction(component_id=component.id, cycle=99999, predicted_rul=1.5,
+                             model_version="test", predicted_at=predicted_at))
+        db.commit()
+        component_id = component.id
+
+    start = (datetime.utcnow() - timedelta(days=2)).isoformat()
+    r = client.get("/api/v1/fleet/1/history", params={"start": start, "resolution": "hour"})
+    assert r.status_code == 200
+    rows = r.json()
+    latest = [row for row in rows if row["component_id"] == component_id][-1]
+    assert datetime.fromisoformat(latest["bucket_start"]) == floor_bucket(predicted_at, "hour")
+    assert latest["last_rul"] == 1.5 and latest["last_cycle"] == 99999
+    assert sum(row["samples"] for row in rows) == 5 * 20 + 1
+    keys = [(row["bucket_start"], row["component_id"]) for row in rows]
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
@@ -0,0 +1,36 @@
+"""Model registry lookups while another model is loading."""
+
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.ml import loader
+
+
+def test_cold_load_does_not_block_other_models(tmp_path, monkeypatch):
+    for name in ("slow", "fast"):
+        (tmp_path / f"{name}.pkl").write_bytes(pickle.dumps({"name": name}))
+    registry = loader.ModelRegistry()
+    registry.index(tmp_path)
+    registry.get("fast")
+
+    started, release = threading.Event(), threading.Event()
+    load_pickle = loader._LOADERS[".pkl"]
+
+    def gated(path):
+        if path.stem == "slow":
+            started.set()
+            assert release.wait(5.0)
+        return load_pickle(path)
+
+    monkeypatch.setitem(loader._LOADERS, ".pkl", gated)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        slow = [pool.submit(registry.get, "slow") for _ in range(2)]
+        assert started.wait(5.0)
+        # Served while "slow" is still loading.
+        assert registry.get("fast") == {"name": "fast"}
+        release.set()
+        assert [f.result(5.0) for f in slow] == [{"name": "slow"}] * 2
+
+    (entry,) = [m for m in registry.stats()["models"] if m["name"] == "slow"]
+    assert entry["loads"] == 1 and entry["loaded"]
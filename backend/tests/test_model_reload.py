@@ -0,0 +1,65 @@
+"""Background model reloads: warm-up input shapes and failed artifacts."""
+
+import os
+import pickle
+import time
+
+import numpy as np
+
+from app.ml import loader
+
+
+class SequenceModel:
+    """Stands in for a Keras model taking (batch, window, features)."""
+
+    def __init__(self, input_shape=(None, 4, 3)):
+        self.input_shape = input_shape
+        self.seen = []
+
+    def predict(self, X):
+        if X.ndim != len(self.input_shape):
+            raise ValueError(f"expected {len(self.input_shape)}-D input, got {X.shape}")
+        self.seen.append(X.shape)
+        return np.zeros(X.shape[0])
+
+
+def _write(path, data, age_s=60.0):
+    path.write_bytes(data)
+    stamp = time.time() - age_s
+    os.utime(path, (stamp, stamp))
+
+
+def test_warm_up_uses_full_input_shape():
+    model = SequenceModel()
+    loader.warm_up(model)
+    assert model.seen and all(shape[1:] == (4, 3) for shape in model.seen)
+
+
+def test_warm_up_skips_unknown_input_shape():
+    model = SequenceModel(input_shape=(None, None, 3))
+    loader.warm_up(model)
+    assert model.seen == []
+
+
+def test_failed_reload_not_retried_until_artifact_changes(tmp_path, monkeypatch):
+    artifact = tmp_path / "seq.pkl"
+    _write(artifact, pickle.dumps(SequenceModel()), age_s=120.0)
+    registry = loader.ModelRegistry()
+    registry.index(tmp_path)
+    good_version = registry.get_versioned("seq")[1]
+
+    calls = []
+    materialize = loader._materialize
+    monkeypatch.setattr(loader, "_materialize", lambda entry: calls.append(entry.version) or materialize(entry))
+
+    _write(artifact, b"not a pickle")
+    assert registry.refresh(tmp_path) == []
+    assert registry.refresh(tmp_path) == []
+    assert len(calls) == 1
+    (stats,) = registry.stats()["models"]
+    assert stats["version"] == good_version and stats["failed_version"] == calls[0]
+
+    _write(artifact, pickle.dumps(SequenceModel((None, 5, 3))), age_s=30.0)
+    assert registry.refresh(tmp_path) == ["seq"]
+    assert registry.stats()["models"][0]["failed_version"] is None
+    assert registry.get("seq").input_shape == (None, 5, 3)
@@ -0,0 +1,33 @@
+"""/rul/stream must answer a malformed message with an error frame and keep the session."""
+
+import json
+import struct
+
+import pytest
+
+
+def _frame(unit_id: str, cycle: int, columns: list[str], rows: int) -> bytes:
+    header = json.dumps({"unit_id": unit_id, "cycle": cycle, "columns": columns,
+                         "rows": rows, "dtype": "<f8"}).encode()
+    return struct.pack("<I", len(header)) + header + bytes(8 * rows * len(columns))
+
+
+@pytest.mark.parametrize("message", [
+    {"unit_id": "1", "cycle": 1, "sensors": {"s1": []}},
+    {"unit_id": "1", "cycle": 1, "sensors": {}},
+    _frame("1", 1, ["s1"], 0),
+], ids=["empty-list", "no-sensors", "zero-row-frame"])
+def test_empty_sample_is_an_error_frame(client, message):
+    with client.websocket_connect("/api/v1/rul/stream") as ws:
+        ws.send_json({"type": "config", "thresholds": {"s1": 0.5}})
+        if isinstance(message, bytes):
+            ws.send_bytes(message)
+        else:
+            ws.send_json(message)
+        reply = ws.receive_json()
+        assert reply["type"] == "error" and "unit 1" in reply["detail"]
+
+        # The session survives: the same unit can keep streaming.
+        ws.send_json({"unit_id": "1", "cycle": 2, "sensors": {"s1": [0.1, 0.9]}})
+        ws.send_json({"unit_id": "1", "cycle": 3, "sensors": {"s1": []}})
+        assert ws.receive_json()["type"] == "error"
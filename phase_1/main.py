@@ -25,7 +25,7 @@ def parse_args():
     parser.add_argument("--size_ratio", type=float, default=None)
     parser.add_argument("--model", type=str, choices=["cnn", "conv_mhsa"], default=None)
     parser.add_argument("--debug", type=str, choices=["true", "false"], default=None)
-    parser.add_argument("--task", type=str, choices=["train", "explain", "all"], default="all")
+    parser.add_argument("--task", type=str, choices=["train", "explain", "export", "quantize", "all"], default="all")
     return parser.parse_args()
 
 
@@ -58,6 +58,14 @@ def main():
         from tasks.explain import run as explain_run
         explain_run(config)
 
+    if args.task == "export":
+        from tasks.export import run as export_run
+        export_run(config)
+
+    if args.task == "quantize":
+        from tasks.quantize import run as quantize_run
+        quantize_run(config)
+
     logger.info("Pipeline Execution Finished.")
 
 
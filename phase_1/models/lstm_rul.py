@@ -22,7 +22,8 @@ warnings.filterwarnings("ignore")
 from utils.seed        import set_seed
 from utils.logger      import get_logger
 from utils.rul_metrics import compute_all, save_metrics
-from utils.plotter     import plot_losses, plot_predictions, plot_trajectory, print_summary
+from utils.feature_spec import add_parity_fixture, build_feature_spec, save_feature_spec
+from utils.plotter_rul import plot_losses, plot_predictions, plot_trajectory, print_summary
 
 logger = get_logger("lstm_rul")
 
@@ -50,6 +51,7 @@ OP_COLS         = ["op1", "op2"]   # used for regime clustering
 
 RUL_CLIP    = 125
 WINDOW_SIZE = 30
+ROLL_WINDOW = 5    # rolling mean / std / min / max length
 BATCH_SIZE  = 256
 EPOCHS      = 100
 LR          = 0.001
@@ -116,7 +118,7 @@ def add_regime_labels(train, test, n_regimes=N_REGIMES):
 # ─────────────────────────────────────────────
 # 3. ROLLING FEATURES
 # ─────────────────────────────────────────────
-def add_rolling_features(df, window=5):
+def add_rolling_features(df, window=ROLL_WINDOW):
     df = df.copy()
     new_cols = {}
     for s in FEATURE_SENSORS:
@@ -136,13 +138,20 @@ def add_rolling_features(df, window=5):
 # which caused the 40× larger SHAP values on FD002.
 # ─────────────────────────────────────────────
 def preprocess(train, test):
+    """
+    Returns (train_scaled, test_scaled, feature_cols, spec), where spec is the
+    fitted pipeline serialized for serving (see utils/feature_spec.py).
+    """
     # Drop unused columns
     train = train.drop(columns=DROP_COLS, errors="ignore")
     test  = test.drop(columns=DROP_COLS,  errors="ignore")
 
     # FIX 1: Add regime labels before rolling features
     logger.info("Clustering operating conditions...")
-    train, test, _ = add_regime_labels(train, test)
+    train, test, kmeans = add_regime_labels(train, test)
+    exclude  = {"unit", "cycle", "RUL", "regime"}
+    raw_cols = [c for c in train.columns if c not in exclude]
+    test_raw = test
 
     # Rolling features
     logger.info("Computing rolling features for train...")
@@ -150,7 +159,6 @@ def preprocess(train, test):
     logger.info("Computing rolling features for test...")
     test  = add_rolling_features(test)
 
-    exclude      = {"unit", "cycle", "RUL", "regime"}
     feature_cols = [c for c in train.columns if c not in exclude]
 
     # FIX 2: Fit one scaler per regime, apply to train + test
@@ -195,7 +203,14 @@ def preprocess(train, test):
     # Final feature list includes regime one-hots
     final_feature_cols = feature_cols + [f"regime_{r}" for r in sorted(train["regime"].unique())]
 
-    return train_scaled, test_scaled, final_feature_cols, scalers
+    spec = build_feature_spec(
+        kmeans, scalers, feature_cols,
+        regime_cols=OP_COLS, raw_cols=raw_cols,
+        rolling_sensors=FEATURE_SENSORS, rolling_window=ROLL_WINDOW, window_size=WINDOW_SIZE,
+    )
+    spec = add_parity_fixture(spec, test_raw, test_scaled, final_feature_cols)
+
+    return train_scaled, test_scaled, final_feature_cols, spec
 
 
 # ─────────────────────────────────────────────
@@ -372,8 +387,9 @@ def main():
 
         # 2. Preprocess (includes regime clustering + per-regime scaling)
         logger.info("[1/4] Preprocessing with regime-aware scaling...")
-        train_proc, test_proc, feature_cols, scalers = preprocess(train_raw, test_raw)
+        train_proc, test_proc, feature_cols, spec = preprocess(train_raw, test_raw)
         logger.info(f"Features: {len(feature_cols)} (includes {N_REGIMES} regime one-hots)")
+        save_feature_spec(spec, f"{CHECKPOINT_DIR}/lstm_{fd}.features.json")
 
         # 3. Split
         logger.info("[2/4] Splitting 80/20 by engine unit...")
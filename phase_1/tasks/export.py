@@ -0,0 +1,181 @@
+"""
+Task: export.py
+Export trained PyTorch checkpoints to graph-optimized TorchScript for CPU serving.
+1. Rebuild the eager model from its .pt state dict
+2. Trace → freeze (folds BatchNorm into the preceding Conv1d) → optimize_for_inference
+3. Verify numerical parity against the eager model (export fails on mismatch)
+4. Benchmark CPU latency / throughput, eager vs exported
+5. Save <name>.ts + <name>.json sidecar (input layout) for backend/app/ml/torch_runtime.py
+
+Usage:
+  python main.py --task export --model cnn
+  python -m tasks.export --lstm FD001
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import torch
+
+from models.cnn_model import CnnModel
+from models.conv_mhsa_model import ConvMhsaModel
+from utils.logger import get_logger
+
+logger = get_logger("export")
+
+PARITY_ATOL = 1e-4
+BENCH_BATCH_SIZES = [1, 16, 64]
+BENCH_ITERS = 50
+
+
+def _num_features_from_state(state, model_type):
+    """Read the input feature count off the first layer's weight shape."""
+    if model_type == "cnn":
+        return state["stem.0.weight"].shape[1]
+    if model_type == "conv_mhsa":
+        return state["conv_embed.0.weight"].shape[1]
+    if model_type == "lstm":
+        return state["lstm1.weight_ih_l0"].shape[1]
+    raise ValueError(f"Unknown model type: {model_type}")
+
+
+def to_torchscript(model, example):
+    """Trace, freeze and optimize an eval-mode model for CPU inference."""
+    model.eval()
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example)
+    frozen = torch.jit.freeze(traced)
+    return torch.jit.optimize_for_inference(frozen)
+
+
+def check_parity(eager, exported, num_features, window_size, atol=PARITY_ATOL, seed=0):
+    """
+    Compare eager vs exported outputs on random windows at several batch sizes.
+    Raises AssertionError when the max absolute difference exceeds atol.
+    """
+    gen = torch.Generator().manual_seed(seed)
+    worst = 0.0
+    with torch.no_grad():
+        for batch in BENCH_BATCH_SIZES:
+            x = torch.randn(batch, window_size, num_features, generator=gen)
+            diff = (eager(x) - exported(x)).abs().max().item()
+            worst = max(worst, diff)
+    if worst > atol:
+        raise AssertionError(f"Exported model diverges from eager: max |diff| = {worst:.2e} > {atol:.0e}")
+    logger.info(f"Parity OK: max |diff| = {worst:.2e}")
+    return worst
+
+
+def benchmark(module, num_features, window_size, threads, iters=BENCH_ITERS):
+    """Return per-batch-size p50/p99 latency (ms) and throughput (windows/s) on CPU."""
+    torch.set_num_threads(threads)
+    results = {}
+    with torch.no_grad():
+        for batch in BENCH_BATCH_SIZES:
+            x = torch.randn(batch, window_size, num_features)
+            for _ in range(5):
+                module(x)
+            times = []
+            for _ in range(iters):
+                t0 = time.perf_counter()
+                module(x)
+                times.append((time.perf_counter() - t0) * 1000.0)
+            times = np.array(times)
+            results[str(batch)] = {
+                "p50_ms": float(np.percentile(times, 50)),
+                "p99_ms": float(np.percentile(times, 99)),
+                "windows_per_s": float(batch * 1000.0 / times.mean()),
+            }
+    return results
+
+
+def export_model(model, name, num_features, window_size, out_dir, output="rul", threads=1):
+    """
+    Export one eager model: TorchScript artifact, sidecar metadata, parity + benchmark report.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    model = model.cpu().eval()
+    example = torch.randn(1, window_size, num_features)
+
+    logger.info(f"Exporting {name} (window={window_size}, features={num_features})")
+    exported = to_torchscript(model, example)
+    max_diff = check_parity(model, exported, num_features, window_size)
+
+    ts_path = os.path.join(out_dir, f"{name}.ts")
+    exported.save(ts_path)
+
+    meta = {
+        "window_size": window_size,
+        "num_features": num_features,
+        "layout": "batch,time,feature",
+        "output": output,
+    }
+    with open(os.path.join(out_dir, f"{name}.json"), "w") as f:
+        json.dump(meta, f, indent=4)
+
+    logger.info("Benchmarking eager vs TorchScript on CPU...")
+    report = {
+        "artifact": ts_path,
+        "parity_max_abs_diff": max_diff,
+        "threads": threads,
+        "eager": benchmark(model, num_features, window_size, threads),
+        "torchscript": benchmark(exported, num_features, window_size, threads),
+    }
+    with open(os.path.join(out_dir, f"{name}_export_report.json"), "w") as f:
+        json.dump(report, f, indent=4)
+
+    for batch in BENCH_BATCH_SIZES:
+        e, t = report["eager"][str(batch)], report["torchscript"][str(batch)]
+        logger.info(
+            f"  batch {batch:>3}: eager {e['p50_ms']:.2f} ms → torchscript {t['p50_ms']:.2f} ms "
+            f"({t['windows_per_s']:.0f} windows/s)"
+        )
+    logger.info(f"Saved {ts_path}")
+    return ts_path
+
+
+def run(config):
+    """Export the configured NGAFID risk model (cnn | conv_mhsa) from its best checkpoint."""
+    model_type = config["model"]["type"]
+    seq_length = config["model"]["window_size"]
+    checkpoint_dir = config["paths"]["checkpoints"]
+
+    model_path = os.path.join(checkpoint_dir, f"best_{model_type}_model.pt")
+    if not os.path.exists(model_path):
+        logger.error(f"No model found at {model_path}!")
+        return
+
+    state = torch.load(model_path, map_location="cpu")
+    num_features = _num_features_from_state(state, model_type)
+    if model_type == "cnn":
+        model = CnnModel(num_features, seq_length, 1, config["model"].get("cnn"))
+    else:
+        model = ConvMhsaModel(num_features, seq_length, 1, config["model"].get("conv_mhsa"))
+    model.load_state_dict(state)
+
+    export_model(
+        model, f"{model_type}_model", num_features, seq_length,
+        out_dir=checkpoint_dir, output="risk_logit",
+    )
+
+
+def run_lstm(fd):
+    """Export the C-MAPSS Bi-LSTM for one sub-dataset from best_lstm_<fd>.pt."""
+    from models.lstm_rul import BiLSTM, CHECKPOINT_DIR, WINDOW_SIZE
+
+    state = torch.load(f"{CHECKPOINT_DIR}/best_lstm_{fd}.pt", map_location="cpu")
+    num_features = _num_features_from_state(state, "lstm")
+    model = BiLSTM(input_size=num_features)
+    model.load_state_dict(state)
+
+    export_model(model, f"lstm_{fd}", num_features, WINDOW_SIZE, out_dir=CHECKPOINT_DIR, output="rul")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a C-MAPSS Bi-LSTM checkpoint to TorchScript")
+    parser.add_argument("--lstm", type=str, default="FD001", help="Sub-dataset: FD001..FD004")
+    args = parser.parse_args()
+    run_lstm(args.lstm)
@@ -0,0 +1,194 @@
+"""
+Task: quantize.py
+Dynamic INT8 quantization of the Bi-LSTM and ConvMHSA models for CPU serving.
+- nn.LSTM and nn.Linear weights → INT8 (activations quantized on the fly).
+  In ConvMHSA this covers the FFN and output head; the attention in_proj is a
+  raw parameter and the conv embedding stays fp32.
+- Writes best_<model>_int8.pt next to the fp32 checkpoint, plus a TorchScript
+  <name>_int8.ts the backend can serve with MODEL_VARIANT=int8
+- Reports accuracy change (RMSE / MAE / NASA score on C-MAPSS test sets for
+  the Bi-LSTM; F1 / ROC-AUC on the NGAFID test split for ConvMHSA), latency
+  and serialized size saved
+
+Usage:
+  python -m tasks.quantize --lstm FD001 FD002 FD003 FD004
+  python main.py --task quantize --model conv_mhsa
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from tasks.export import benchmark, export_model, _num_features_from_state
+from utils.logger import get_logger
+
+logger = get_logger("quantize")
+
+QUANTIZED_MODULES = {nn.LSTM, nn.Linear}
+
+
+def quantize_dynamic(model):
+    """Return an INT8 dynamically quantized copy of an eval-mode fp32 model.
+
+    Run the copy inside `int8_kernels(copy)`.
+    """
+    model = model.cpu().eval()
+    return torch.ao.quantization.quantize_dynamic(model, QUANTIZED_MODULES, dtype=torch.qint8)
+
+
+@contextlib.contextmanager
+def int8_kernels(model):
+    """Disable the fused MHA fast path while a quantized transformer runs, then restore it.
+
+    The fast path reads Linear.weight as a tensor; a quantized Linear exposes
+    it as a method, so the int8 copy needs the regular kernels. Scoped so the
+    fp32 baseline keeps the fast path.
+    """
+    if not any(isinstance(m, nn.TransformerEncoderLayer) for m in model.modules()):
+        yield
+        return
+    previous = torch.backends.mha.get_fastpath_enabled()
+    torch.backends.mha.set_fastpath_enabled(False)
+    try:
+        yield
+    finally:
+        torch.backends.mha.set_fastpath_enabled(previous)
+
+
+def serialized_mb(model):
+    """Size of the model's state dict when saved, in MB."""
+    buf = io.BytesIO()
+    torch.save(model.state_dict(), buf)
+    return buf.getbuffer().nbytes / 2**20
+
+
+def _compare_cost(fp32, int8, num_features, window_size, threads=1):
+    """Latency at each benchmark batch size and serialized size, fp32 vs int8."""
+    fp32_bench = benchmark(fp32, num_features, window_size, threads)
+    with int8_kernels(int8):
+        int8_bench = benchmark(int8, num_features, window_size, threads)
+    fp32_mb, int8_mb = serialized_mb(fp32), serialized_mb(int8)
+    return {
+        "size_mb": {"fp32": fp32_mb, "int8": int8_mb, "saved_pct": 100.0 * (1 - int8_mb / fp32_mb)},
+        "latency": {
+            batch: {
+                "fp32_p50_ms": fp32_bench[batch]["p50_ms"],
+                "int8_p50_ms": int8_bench[batch]["p50_ms"],
+                "speedup": fp32_bench[batch]["p50_ms"] / int8_bench[batch]["p50_ms"],
+            }
+            for batch in fp32_bench
+        },
+    }
+
+
+def run_lstm(fds):
+    """Quantize best_lstm_<fd>.pt for each sub-dataset and score both variants on its test set."""
+    from models.lstm_rul import (
+        BiLSTM, CHECKPOINT_DIR, RESULTS_DIR, WINDOW_SIZE,
+        get_predictions, load_data, preprocess,
+    )
+    from utils.feature_spec import save_feature_spec
+    from utils.rul_metrics import compute_all, save_metrics
+
+    device = torch.device("cpu")
+    for fd in fds:
+        logger.info(f"\n{'#'*55}\nQUANTIZE Bi-LSTM {fd}\n{'#'*55}")
+        state = torch.load(f"{CHECKPOINT_DIR}/best_lstm_{fd}.pt", map_location="cpu")
+        num_features = _num_features_from_state(state, "lstm")
+        fp32 = BiLSTM(input_size=num_features)
+        fp32.load_state_dict(state)
+        fp32.eval()
+        int8 = quantize_dynamic(fp32)
+
+        torch.save(int8.state_dict(), f"{CHECKPOINT_DIR}/best_lstm_{fd}_int8.pt")
+
+        train_raw, test_raw = load_data(fd)
+        _, test_proc, feature_cols, spec = preprocess(train_raw, test_raw)
+        save_feature_spec(spec, f"{CHECKPOINT_DIR}/lstm_{fd}_int8.features.json")
+        fp32_preds, actuals = get_predictions(fp32, test_proc, feature_cols, device)
+        with int8_kernels(int8):
+            int8_preds, _ = get_predictions(int8, test_proc, feature_cols, device)
+        fp32_m, int8_m = compute_all(actuals, fp32_preds), compute_all(actuals, int8_preds)
+
+        report = {
+            "fd": fd,
+            "fp32": fp32_m,
+            "int8": int8_m,
+            "delta": {k: int8_m[k] - fp32_m[k] for k in fp32_m},
+            **_compare_cost(fp32, int8, num_features, WINDOW_SIZE),
+        }
+        save_metrics(report, filepath=f"{RESULTS_DIR}/quantize_lstm_{fd}.json")
+        logger.info(
+            f"RMSE {fp32_m['rmse']:.3f} → {int8_m['rmse']:.3f} | "
+            f"NASA {fp32_m['nasa_score']:.1f} → {int8_m['nasa_score']:.1f} | "
+            f"size {report['size_mb']['fp32']:.2f} → {report['size_mb']['int8']:.2f} MB"
+        )
+
+        with int8_kernels(int8):
+            export_model(int8, f"lstm_{fd}_int8", num_features, WINDOW_SIZE, out_dir=CHECKPOINT_DIR, output="rul")
+
+
+def run(config):
+    """Quantize the configured NGAFID risk model and compare it on the test split."""
+    from data.sample_loader import load_data
+    from models.trainer import get_predictions
+    from tasks.train_classification import build_model
+    from utils.metrics import calculate_classification_metrics, save_metrics
+
+    model_type = config["model"]["type"]
+    seq_length = config["model"]["window_size"]
+    checkpoint_dir = config["paths"]["checkpoints"]
+    results_dir = config["paths"]["results"]
+
+    model_path = os.path.join(checkpoint_dir, f"best_{model_type}_model.pt")
+    if not os.path.exists(model_path):
+        logger.error(f"No model found at {model_path}!")
+        return
+
+    state = torch.load(model_path, map_location="cpu")
+    num_features = _num_features_from_state(state, model_type)
+    fp32 = build_model(num_features, config)
+    fp32.load_state_dict(state)
+    fp32.eval()
+    int8 = quantize_dynamic(fp32)
+    torch.save(int8.state_dict(), os.path.join(checkpoint_dir, f"best_{model_type}_model_int8.pt"))
+
+    cpu_config = {**config, "training": {**config["training"], "device": "cpu"}}
+    _, _, test_loader, _, _ = load_data(config)
+    targets, fp32_probs = get_predictions(fp32, test_loader, cpu_config)
+    with int8_kernels(int8):
+        _, int8_probs = get_predictions(int8, test_loader, cpu_config)
+    fp32_m = calculate_classification_metrics(targets, fp32_probs)
+    int8_m = calculate_classification_metrics(targets, int8_probs)
+
+    report = {
+        "model_type": model_type,
+        "fp32": {k: fp32_m[k] for k in ("f1", "roc_auc", "avg_precision")},
+        "int8": {k: int8_m[k] for k in ("f1", "roc_auc", "avg_precision")},
+        "max_abs_prob_diff": float(np.max(np.abs(np.asarray(fp32_probs) - np.asarray(int8_probs)))),
+        **_compare_cost(fp32, int8, num_features, seq_length),
+    }
+    save_metrics(report, os.path.join(results_dir, f"quantize_{model_type}.json"))
+    logger.info(
+        f"ROC-AUC {report['fp32']['roc_auc']:.4f} → {report['int8']['roc_auc']:.4f} | "
+        f"size {report['size_mb']['fp32']:.2f} → {report['size_mb']['int8']:.2f} MB"
+    )
+
+    with int8_kernels(int8):
+        export_model(
+            int8, f"{model_type}_model_int8", num_features, seq_length,
+            out_dir=checkpoint_dir, output="risk_logit",
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="INT8-quantize C-MAPSS Bi-LSTM checkpoints")
+    parser.add_argument("--lstm", nargs="+", default=["FD001", "FD002", "FD003", "FD004"])
+    args = parser.parse_args()
+    run_lstm(args.lstm)
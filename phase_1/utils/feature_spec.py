@@ -0,0 +1,74 @@
+"""
+utils/feature_spec.py
+Serialize the fitted C-MAPSS feature pipeline (lstm_rul.preprocess) so the
+backend can replay it exactly: backend/app/ml/features.py reads this file.
+
+The spec holds
+  - raw input columns and the op columns used for regime assignment
+  - KMeans regime centroids
+  - rolling window length and which sensors get mean / std / min / max
+  - feature column order (before scaling) and per-regime MinMaxScaler min_ / scale_
+  - regime one-hot order and the model's window size
+  - a parity fixture: one raw unit history and the features training produced
+    for it, which the backend checks at load time
+"""
+
+import json
+import os
+
+SPEC_VERSION = 1
+ROLLING_STATS = ["mean", "std", "min", "max"]
+
+
+def build_feature_spec(kmeans, scalers, feature_cols, regime_cols, raw_cols,
+                       rolling_sensors, rolling_window, window_size):
+    """Collect a fitted pipeline's parameters into a JSON-serializable dict."""
+    regimes = sorted(scalers)
+    return {
+        "version": SPEC_VERSION,
+        "raw_columns": list(raw_cols),
+        "regime_columns": list(regime_cols),
+        "centroids": kmeans.cluster_centers_.tolist(),
+        "rolling": {
+            "window": rolling_window,
+            "sensors": list(rolling_sensors),
+            "stats": ROLLING_STATS,
+        },
+        "feature_columns": list(feature_cols),
+        "scalers": {
+            "regimes": [int(r) for r in regimes],
+            "min": [scalers[r].min_.tolist() for r in regimes],
+            "scale": [scalers[r].scale_.tolist() for r in regimes],
+        },
+        "window_size": window_size,
+    }
+
+
+def add_parity_fixture(spec, raw_df, processed_df, output_cols):
+    """
+    Attach the first unit with a full window as a parity fixture.
+    raw_df holds unprocessed rows, processed_df the rows preprocess() produced.
+    """
+    needed = spec["window_size"] + spec["rolling"]["window"] - 1
+    for unit, grp in raw_df.groupby("unit"):
+        if len(grp) < needed:
+            continue
+        grp  = grp.sort_values("cycle").iloc[:needed]
+        proc = processed_df[processed_df["unit"] == unit].sort_values("cycle").iloc[:needed]
+        spec["check"] = {
+            "raw": grp[spec["raw_columns"]].astype(float).values.tolist(),
+            "expected": proc[output_cols].astype(float).values[-spec["window_size"]:].tolist(),
+        }
+        return spec
+    raise ValueError(f"No unit has the {needed} cycles needed for a parity fixture")
+
+
+def save_feature_spec(spec, filepath):
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, "w") as f:
+        json.dump(spec, f)
+
+
+def load_feature_spec(filepath):
+    with open(filepath) as f:
+        return json.load(f)